@@ -7,12 +7,22 @@
 ╚══════════════════════════════════════════════════════════════╝
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 import json
+import gzip
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from parser import parse_input
+from functools import lru_cache
+import codec
+from parser import (parse_input, parse_stream, configure_parse_cache, parse_cache_stats,
+                    char_budget, ParseTimings, InputTooLarge, read_json_bytes)
+from cache import LRUCache, SQLiteCache, TieredCache, content_key
 
 # ── SDK 자동 감지 ──
 try:
@@ -29,7 +39,47 @@ try:
 except ImportError:
     pass
 
+# 파싱 결과 캐시 (PARSE_CACHE_DB 지정 시 워커 간 공유 SQLite 캐시 사용)
+configure_parse_cache(
+    max_entries=int(os.getenv('PARSE_CACHE_SIZE', '64')),
+    db_path=os.getenv('PARSE_CACHE_DB') or None
+)
+
+# 압축을 푼 입력의 상한 (압축 폭탄 방지, 넘으면 413)
+#   GZIP_JSON_MAX_BYTES: JSON 문서 — gzip JSON 본문과 업로드된 JSON 내보내기 파일 (통째로 읽으므로)
+#   UPLOAD_MAX_BYTES / UPLOAD_MAX_LINE_BYTES: 업로드 로그 전체 / 한 줄 (로그는 줄 단위로 스트리밍)
+GZIP_JSON_MAX_BYTES = int(os.getenv('GZIP_JSON_MAX_BYTES', str(64 * 1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(1024 * 1024 * 1024)))
+UPLOAD_MAX_LINE_BYTES = int(os.getenv('UPLOAD_MAX_LINE_BYTES', str(16 * 1024 * 1024)))
+
+# 기능별로 이미 분석한 정책 지문 — skip_analyzed 요청 시 프롬프트에서 제외
+ANALYZED_POLICIES = LRUCache(int(os.getenv('ANALYZED_CACHE_SIZE', '10000')))
+
+# Gemini 응답 캐시 — 메모리 LRU + (LLM_CACHE_DB 지정 시) 워커 간 공유 SQLite, LLM_CACHE_TTL 초 후 만료
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))
+LLM_CACHE = TieredCache(
+    LRUCache(int(os.getenv('LLM_CACHE_SIZE', '256')), ttl=LLM_CACHE_TTL),
+    SQLiteCache(os.getenv('LLM_CACHE_DB'), table="llm_cache",
+                max_entries=int(os.getenv('LLM_CACHE_DB_SIZE', '10000')), ttl=LLM_CACHE_TTL)
+    if os.getenv('LLM_CACHE_DB') else None
+)
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """응답/요청 JSON 을 codec 으로 (orjson 있으면 사용) — 한글 그대로 (ensure_ascii=False)"""
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        return codec.dumps(obj, pretty=bool(kwargs.get("indent")),
+                           sort_keys=kwargs.get("sort_keys", self.sort_keys),
+                           default=kwargs.get("default", self.default))
+
+    def loads(self, s, **kwargs):
+        return codec.loads(s)
+
+
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 CORS(app)
 
 # ═══════════════════════════════════════════════════
@@ -50,7 +100,121 @@ print(f"[✓] Gemini 모델: {MODEL_NAME}")
 print("[✓] Policy Analyzer v2.5 — 6개 제품 통합 (매뉴얼 기반 KB)")
 
 
-def call_gemini(prompt):
+def call_gemini(prompt, timings=None):
+    """Gemini 호출 — timings 가 있으면 "llm" 단계로 소요 시간 기록"""
+    start = time.perf_counter()
+    try:
+        return _generate(prompt)
+    finally:
+        if timings is not None:
+            timings.record("llm", time.perf_counter() - start, prompt_chars=len(prompt))
+
+
+NO_RESPONSE_TEXT = "AI가 응답을 생성하지 못했습니다."
+
+
+def normalize_query(query):
+    """캐시 키용 질의 정규화 — 앞뒤/연속 공백, 대소문자 차이 무시"""
+    return " ".join(query.split()).casefold()
+
+
+def llm_cache_key(feature, system_prompt, policy_text, query="", meta=""):
+    """기능 + 모델 + 프롬프트/KB 버전(시스템 프롬프트 해시) + clean_json 해시 + 정규화된 질의"""
+    return content_key("llm", feature, MODEL_NAME, content_key(system_prompt),
+                       content_key(policy_text), meta, normalize_query(query))
+
+
+def _cache_lookup(key, bypass, timings):
+    """응답 캐시 조회 (bypass 면 조회하지 않음) — 없으면 None"""
+    if bypass:
+        return None
+    start = time.perf_counter()
+    cached = LLM_CACHE.get(key)
+    if timings is not None:
+        timings.record("llm_cache", time.perf_counter() - start, hit=cached is not None)
+    return cached
+
+
+def cached_gemini(prompt, key, bypass=False, timings=None):
+    """
+    응답 캐시를 거친 Gemini 호출 → (결과, 캐시 상태 "hit" | "miss" | "bypass")
+    bypass 면 조회하지 않고 새로 호출한 결과로 캐시를 갱신한다. 빈 응답은 저장하지 않음.
+    """
+    cached = _cache_lookup(key, bypass, timings)
+    if cached is not None:
+        return cached, "hit"
+    result = call_gemini(prompt, timings)
+    if result != NO_RESPONSE_TEXT:
+        LLM_CACHE.put(key, result)
+    return result, "bypass" if bypass else "miss"
+
+
+def stream_gemini(prompt, timings=None):
+    """Gemini 스트리밍 호출 — 텍스트 조각을 받는 대로 yield, "llm" 단계에 첫 조각까지의 시간도 기록"""
+    start = time.perf_counter()
+    first = None
+    try:
+        for text in _generate_stream(prompt):
+            if first is None:
+                first = time.perf_counter() - start
+            yield text
+    finally:
+        if timings is not None:
+            timings.record("llm", time.perf_counter() - start, prompt_chars=len(prompt),
+                           first_chunk_ms=round(first * 1000, 3) if first is not None else None)
+
+
+def cached_gemini_stream(prompt, key, bypass=False, timings=None):
+    """
+    cached_gemini 의 스트리밍 버전 — ("cache", 상태) 다음 ("chunk", 텍스트) 를 차례로 yield.
+    캐시 적중이면 저장된 응답을 한 조각으로, 아니면 모델 출력을 받는 대로 전달하고
+    끝까지 받은 응답만 캐시에 저장한다 (중간에 끊기면 저장하지 않음).
+    """
+    cached = _cache_lookup(key, bypass, timings)
+    if cached is not None:
+        yield "cache", "hit"
+        yield "chunk", cached
+        return
+    yield "cache", "bypass" if bypass else "miss"
+    parts = []
+    for text in stream_gemini(prompt, timings):
+        parts.append(text)
+        yield "chunk", text
+    result = "".join(parts)
+    if not result:
+        yield "chunk", NO_RESPONSE_TEXT
+    else:
+        LLM_CACHE.put(key, result)
+
+
+def _generate_stream(prompt):
+    """SDK 버전에 관계없이 Gemini 스트리밍 호출 — 조각별 텍스트"""
+    if NEW_SDK:
+        chunks = client.models.generate_content_stream(
+            model=MODEL_NAME,
+            contents=prompt,
+            config=types.GenerateContentConfig(temperature=0.3)
+        )
+    else:
+        chunks = model.generate_content(
+            prompt,
+            generation_config=genai.GenerationConfig(temperature=0.3),
+            stream=True
+        )
+    for chunk in chunks:
+        text = _chunk_text(chunk)
+        if text:
+            yield text
+
+
+def _chunk_text(chunk):
+    try:
+        return chunk.text
+    except Exception:
+        return None  # 안전 필터 등으로 텍스트 없는 조각
+
+
+def _generate(prompt):
     """SDK 버전에 관계없이 Gemini 호출"""
     if NEW_SDK:
         response = client.models.generate_content(
@@ -63,6 +227,10 @@ def call_gemini(prompt):
             prompt,
             generation_config=genai.GenerationConfig(temperature=0.3)
         )
+    return _response_text(response)
+
+
+def _response_text(response):
     try:
         return response.text
     except Exception:
@@ -71,13 +239,207 @@ def call_gemini(prompt):
             for part in response.candidates[0].content.parts:
                 if hasattr(part, 'text') and part.text:
                     result += part.text
-        return result or "AI가 응답을 생성하지 못했습니다."
+        return result or NO_RESPONSE_TEXT
+
+
+# ── 비동기 호출 (asgi.py) — 응답을 기다리는 동안 워커 스레드 대신 이벤트 루프가 다른 요청 처리 ──
+async def _cache_io(fn, *args):
+    """LLM_CACHE 조회/저장 — SQLite 계층이 있으면 스레드에서 (디스크 I/O 가 이벤트 루프를 막지 않도록)"""
+    if LLM_CACHE.disk is None:
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+async def call_gemini_async(prompt, timings=None):
+    """call_gemini 의 비동기 버전 (SDK 비동기 클라이언트)"""
+    start = time.perf_counter()
+    try:
+        return await _generate_async(prompt)
+    finally:
+        if timings is not None:
+            timings.record("llm", time.perf_counter() - start, prompt_chars=len(prompt))
+
+
+async def cached_gemini_async(prompt, key, bypass=False, timings=None):
+    """cached_gemini 의 비동기 버전 → (결과, 캐시 상태)"""
+    cached = await _cache_io(_cache_lookup, key, bypass, timings)
+    if cached is not None:
+        return cached, "hit"
+    result = await call_gemini_async(prompt, timings)
+    if result != NO_RESPONSE_TEXT:
+        await _cache_io(LLM_CACHE.put, key, result)
+    return result, "bypass" if bypass else "miss"
+
+
+async def stream_gemini_async(prompt, timings=None):
+    """stream_gemini 의 비동기 버전"""
+    start = time.perf_counter()
+    first = None
+    try:
+        async for text in _generate_stream_async(prompt):
+            if first is None:
+                first = time.perf_counter() - start
+            yield text
+    finally:
+        if timings is not None:
+            timings.record("llm", time.perf_counter() - start, prompt_chars=len(prompt),
+                           first_chunk_ms=round(first * 1000, 3) if first is not None else None)
+
+
+async def cached_gemini_stream_async(prompt, key, bypass=False, timings=None):
+    """cached_gemini_stream 의 비동기 버전"""
+    cached = await _cache_io(_cache_lookup, key, bypass, timings)
+    if cached is not None:
+        yield "cache", "hit"
+        yield "chunk", cached
+        return
+    yield "cache", "bypass" if bypass else "miss"
+    parts = []
+    async for text in stream_gemini_async(prompt, timings):
+        parts.append(text)
+        yield "chunk", text
+    result = "".join(parts)
+    if not result:
+        yield "chunk", NO_RESPONSE_TEXT
+    else:
+        await _cache_io(LLM_CACHE.put, key, result)
+
+
+async def _generate_async(prompt):
+    if NEW_SDK:
+        response = await client.aio.models.generate_content(
+            model=MODEL_NAME,
+            contents=prompt,
+            config=types.GenerateContentConfig(temperature=0.3)
+        )
+    else:
+        response = await model.generate_content_async(
+            prompt,
+            generation_config=genai.GenerationConfig(temperature=0.3)
+        )
+    return _response_text(response)
+
+
+async def _generate_stream_async(prompt):
+    if NEW_SDK:
+        chunks = await client.aio.models.generate_content_stream(
+            model=MODEL_NAME,
+            contents=prompt,
+            config=types.GenerateContentConfig(temperature=0.3)
+        )
+    else:
+        chunks = await model.generate_content_async(
+            prompt,
+            generation_config=genai.GenerationConfig(temperature=0.3),
+            stream=True
+        )
+    async for chunk in chunks:
+        text = _chunk_text(chunk)
+        if text:
+            yield text
+
+
+def flag(value):
+    """JSON true / 폼·쿼리 문자열 "1", "true", "on" → True"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def wants_timings(data):
+    """요청 본문 "timings": true 또는 ?timings=1 이면 parser_info 에 단계별 시간 포함"""
+    return flag(data.get('timings')) or request.args.get('timings') in ('1', 'true')
+
+
+def bypasses_cache(data):
+    """요청 본문 "bypass_cache": true 또는 ?bypass_cache=1 이면 응답 캐시를 조회하지 않음 (결과는 갱신)"""
+    return flag(data.get('bypass_cache')) or request.args.get('bypass_cache') in ('1', 'true')
+
+
+def read_request():
+    """
+    요청 → (옵션 dict, 업로드 스트림 | None)
+      - multipart 파일 업로드 ("file" 필드, gzip/bz2/zip/평문): 옵션은 폼 필드
+      - JSON 이 아닌 본문 (Content-Encoding: gzip 등): 본문 자체가 로그, 옵션은 쿼리 문자열
+      - JSON 본문: 기존 {"policy": ...} — Content-Encoding: gzip 이면 조각 단위로 풀어서 디코딩
+    업로드 스트림은 parse_stream 이 압축을 풀면서 바로 파싱한다 (본문 전체를 버퍼링하지 않음).
+    풀린 크기가 상한(GZIP_JSON_MAX_BYTES, UPLOAD_MAX_*)을 넘으면 InputTooLarge → 413.
+    """
+    if request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        upload = request.files.get('file')
+        return request.form.to_dict(), upload.stream if upload is not None else None
+    gzipped = request.headers.get('Content-Encoding', '').lower() == 'gzip'
+    if request.is_json:
+        if gzipped:
+            return read_gzip_json(request.stream), None
+        return request.get_json(), None
+    if request.content_length == 0:
+        return request.args.to_dict(), None
+    return request.args.to_dict(), request.stream
+
+
+def read_gzip_json(stream, limit=None):
+    """gzip JSON 본문 → 객체. 압축 본문을 한 번에 읽지 않고 풀면서 크기를 확인한다"""
+    with gzip.GzipFile(fileobj=stream, mode="rb") as f:
+        return codec.loads(read_json_bytes(f, GZIP_JSON_MAX_BYTES if limit is None else limit))
+
+
+def error_response(e, status=500):
+    """예외 → JSON 오류 응답 (본문 / 압축을 푼 입력의 크기 초과는 413)"""
+    if isinstance(e, RequestEntityTooLarge):
+        return jsonify({"error": e.description}), 413
+    if isinstance(e, InputTooLarge):
+        return jsonify({"error": str(e)}), 413
+    return jsonify({"error": str(e)}), status
+
+
+def parse_request(data, stream, timings):
+    """read_request 결과 → 파싱 결과 (정책 입력이 없으면 None)"""
+    if stream is not None:
+        return parse_stream(stream, timings=timings, max_bytes=UPLOAD_MAX_BYTES,
+                            max_line=UPLOAD_MAX_LINE_BYTES, max_json=GZIP_JSON_MAX_BYTES)
+    policy_json = data.get('policy', '')
+    if not policy_json:
+        return None
+    # parser.py가 알아서 처리 (깨끗한 JSON이든 더러운 로그든)
+    return parse_input(policy_json, use_cache=True, timings=timings)
+
+
+def parser_info(parsed, timings=None):
+    info = {
+        "input_type": parsed['input_type'],
+        "policy_count": parsed['policy_count'],
+        "products": parsed['products_found']
+    }
+    if timings is not None:
+        info["timings"] = timings.as_dict()
+    return info
+
+
+def iter_fingerprints(parsed):
+    for table in parsed['fingerprints'].values():
+        yield from table.values()
+
+
+def skip_analyzed(parsed, feature, enabled):
+    """enabled 면 이 기능으로 이미 분석한 정책을 뺀 결과와 건너뛴 지문 목록 반환"""
+    if not enabled:
+        return parsed, []
+    skipped = [fp for fp in iter_fingerprints(parsed) if ANALYZED_POLICIES.get(f"{feature}:{fp}")]
+    return parsed.without_policies(skipped), skipped
+
+
+def mark_analyzed(fingerprints, feature):
+    """프롬프트에 실제로 들어간 정책 지문 (ParseResult.serialize_kept) 을 분석 완료로 기록"""
+    for fp in fingerprints:
+        ANALYZED_POLICIES.put(f"{feature}:{fp}", True)
 
 
 # ═══════════════════════════════════════════════════
 # 정책 지식 베이스 (RAG Knowledge Base) — 6개 제품 통합
 # ═══════════════════════════════════════════════════
-POLICY_KNOWLEDGE = """
+# 공통 섹션 (시스템 구조, 우선순위, 공통 필드, 제품 목록)
+KB_COMMON = """
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 📚 이노티움 6개 제품 정책 필드 정의서 (Knowledge Base v2.5 — 매뉴얼 기반)
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -112,6 +474,11 @@ POLICY_KNOWLEDGE = """
 5. **LizardBackup(리자드백업)** — 파일 백업/복구
 6. **innoMark(이노마크)** — 화면/출력 워터마크 + 캡처 방지
 
+"""
+
+# 제품별 필드 정의 — 키는 parser.PRODUCT_SIGNATURES 의 제품명
+KB_PRODUCTS = {
+    "SecureZone": """\
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ## ① SecureZone (시큐어존) — 엔드포인트 보안(영역암호화 DRM)
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -202,6 +569,8 @@ PC에 보안드라이브(암호화 가상디스크)를 생성하여 파일 보
 | pickExceptDrive | 예외 드라이브 | 🟡 |
 | usbControlAuth | USB(0:미사용,1:읽기전용,2:차단) | 🔴 |
 
+""",
+    "RansomCruncher": """\
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ## ② RansomCruncher (랜섬크런처) — 랜섬웨어 탐지/차단
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -270,6 +639,8 @@ PC에 보안드라이브(암호화 가상디스크)를 생성하여 파일 보
 | processName | 프로세스 이름 |
 | sha2 | SHA-256 해시(무결성 검증, 빈값=이름만판별→위변조위험) |
 
+""",
+    "nPouch": """\
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ## ③ nPouch (엔파우치) — 파일 암호화 반출 + 원본보호
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -335,6 +706,8 @@ PC에 보안드라이브(암호화 가상디스크)를 생성하여 파일 보
 | 70 | 법인등록번호 | 80 | 신용카드번호 |
 | 85 | 계좌번호 | | |
 
+""",
+    "innoECM": """\
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ## ④ innoECM — 문서중앙화
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -376,6 +749,8 @@ LizardBackup 원격저장소 프로토콜에 `innoECM` 선택 가능 → ECM 서
 | specialIpAddressConnectType | 특수 IP 접속(0=미사용) | 🟡 |
 | isDefault | 기본 정책 여부 | 🟡 |
 
+""",
+    "LizardBackup": """\
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ## ⑤ LizardBackup (리자드백업) — 백업/복구
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -484,6 +859,8 @@ PC/서버 무차별 공격 대비 데이터 안전 보관. 실시간/스케줄 
 ★ storageProtocolType=innoECM → ECM 서버를 백업 저장소로 사용 (교차 진단 대상)
 ★ 파일 전송 속도제한: 업로드/다운로드 MB/s, 상시/매일/매주 시간대별, IP별 개별 제한 가능
 
+""",
+    "innoMark": """\
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ## ⑥ innoMark (이노마크) — 워터마크 + 캡처 방지
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -585,6 +962,11 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 | isBlockFileCopy | **RDP 파일복사 차단** | 🔴 |
 | isBeforeShutdownText / beforeShutdownTextMinute | 종료 안내 | 🟡 |
 
+""",
+}
+
+# 제품 간 관계 구조 + 교차 참조 (공통)
+KB_RELATIONS = """\
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ## 정책 간 관계 구조 (6개 제품) + 교차 진단
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -629,6 +1011,10 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 5. RansomCruncher 보호확장자 ↔ LizardBackup 백업확장자 — 보호 대상=백업 대상 일치 권장
 6. innoMark 화면워터마크 ↔ nPouch 원본보호 screenWaterMark — 이중 워터마크 가능성
 
+"""
+
+# 분석 시 주의사항 — 공통 규칙 / 제품별 규칙 / 출력 규칙 (규칙 번호는 전체 기준 그대로)
+KB_RULES_COMMON = """\
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ## 분석 시 주의사항 (72개 규칙)
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -643,6 +1029,10 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 7. 정책 우선순위: 사용자 개별 > 사용자 통합 > 부서 개별 > 부서 통합
 8. 모든 에이전트 로그 경로: C:\\Program Files (x86)\\Innotium
 
+"""
+
+KB_PRODUCT_RULES = {
+    "SecureZone": """\
 **SecureZone (9~18):**
 9. 핵심 보안(isTakeoutDriveBlock, isClipboardRestrict 등) 전부 꺼짐 → 보안드라이브만 있고 통제 없음 🔴
 10. isAllowDenyProcess=0이고 allowDenyProcessTemplateId에 값 → 무의미 설정
@@ -655,6 +1045,8 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 17. pickDenyDrive에 보안드라이브 문자 포함 → 자기 자신 차단 (설정 충돌)
 18. isRegistEcmDrive=true이나 ECM 에이전트 미설치 → 연동 불가
 
+""",
+    "RansomCruncher": """\
 **RansomCruncher (19~32):**
 19. isRollbackUse=false → 복구불가 🔴
 20. protectExtension="txt"만 → 보호범위 극소, docx/xlsx/pptx/hwp/pdf 추가 권장
@@ -671,6 +1063,8 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 31. isRemoveIsolatedProcess=true이고 isBlockProcessIsolation=false → 격리 안 하는데 삭제 설정 → 무의미
 32. 공통프로세스 차단목록에 explorer.exe 등 시스템 프로세스 → 시스템 불안정 위험
 
+""",
+    "nPouch": """\
 **nPouch (33~44):**
 33. isOriginProtectPolicy=true + ID=0 → 연동됐으나 미연결
 34. isScreenWaterMark=true + text="" + opacity=0 → 보이지않는 워터마크
@@ -685,6 +1079,8 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 43. 개인정보검출 count=0 → 1건이라도 검출 시 알림 (과민 설정)
 44. nPouch 사용중지 명령 → 수신자가 열람 시 파일 즉시 삭제 (감사 추적용)
 
+""",
+    "innoECM": """\
 **innoECM (45~52):**
 45. isUploadOverQuota=true → 쿼터무시 🔴
 46. isAgentDuplicateLoginDeny=false → 동시접속
@@ -695,6 +1091,8 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 51. privateStorageQuota > storageQuota → 개인용량이 전체보다 큼 (설정 모순)
 52. isAgentFileCopyUse=true → 에이전트에서 파일 복사 허용 (유출 경로)
 
+""",
+    "LizardBackup": """\
 **LizardBackup (53~64):**
 53. source/targetFolderPath=null → 백업동작불가 🔴
 54. isBackupRealtime=false + isBackupSchedule=false → 트리거없음 🔴
@@ -709,6 +1107,8 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 63. lbRemoteStorageId=null + 로컬경로만 → 재해복구 취약 🟠
 64. storageProtocolType=innoECM → ECM 저장소 정책(용량/확장자) 확인 필요 (교차 진단)
 
+""",
+    "innoMark": """\
 **innoMark (65~76):**
 65. 보안필드 대부분 null → 껍데기 정책
 66. isCapturePrevent=null → 캡처자유 🔴
@@ -723,6 +1123,10 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 75. isWatermarkLocationMove=true + 이동주기<5초 → 과도한 이동 (사용성 저하)
 76. 대상 워터마크 설정이나 트리거 프로세스/URL 0개 → 조건 없어 미동작
 
+""",
+}
+
+KB_OUTPUT_RULES = """\
 **출력 규칙 (77~80):**
 77. JSON원문 그대로 출력 금지 — 반드시 자연어
 78. 필드명도 "이 필드는 ~" 형태로 설명
@@ -731,11 +1135,27 @@ isOptionAlwaysUse=false → 트리거 조건 충족 시에만 활성화
 """
 
 
+def build_knowledge(products):
+    """products (KB_PRODUCTS 순서) 에 해당하는 제품 섹션 + 공통 섹션으로 지식 베이스 조립"""
+    return "".join((
+        KB_COMMON,
+        *(KB_PRODUCTS[p] for p in products),
+        KB_RELATIONS,
+        KB_RULES_COMMON,
+        *(KB_PRODUCT_RULES[p] for p in products),
+        KB_OUTPUT_RULES,
+    ))
+
+
+KB_PRODUCT_ORDER = tuple(KB_PRODUCTS)
+POLICY_KNOWLEDGE = build_knowledge(KB_PRODUCT_ORDER)  # 6개 제품 전체
+
+
 # ═══════════════════════════════════════════════════
-# 기능별 시스템 프롬프트
+# 기능별 시스템 프롬프트 — {POLICY_KNOWLEDGE} 자리에 제품별로 조립한 KB (feature_prompt)
 # ═══════════════════════════════════════════════════
 
-TRANSLATE_PROMPT = f"""당신은 이노티움(Innotium) 보안 솔루션 6개 제품의 정책 분석 전문가입니다.
+TRANSLATE_PROMPT = """당신은 이노티움(Innotium) 보안 솔루션 6개 제품의 정책 분석 전문가입니다.
 입력된 정책 JSON을 **사람이 읽을 수 있는 자연어**로 번역하세요.
 
 ⚠ 절대 규칙:
@@ -771,7 +1191,7 @@ ID로 참조된 템플릿, 제어스위트 등
 누락, 위험, 개선 제안
 """
 
-SIMULATE_PROMPT = f"""당신은 이노티움(Innotium) 보안 솔루션 6개 제품의 정책 시뮬레이션 전문가입니다.
+SIMULATE_PROMPT = """당신은 이노티움(Innotium) 보안 솔루션 6개 제품의 정책 시뮬레이션 전문가입니다.
 정책 JSON + 시나리오 질의 → 해당 정책 하에서 어떤 일이 벌어지는지 시뮬레이션하세요.
 
 ⚠ 절대 규칙:
@@ -799,7 +1219,7 @@ SIMULATE_PROMPT = f"""당신은 이노티움(Innotium) 보안 솔루션 6개 제
 추가 컨텍스트
 """
 
-DIAGNOSE_PROMPT = f"""당신은 이노티움(Innotium) 보안 솔루션 6개 제품의 정책 진단 전문가입니다.
+DIAGNOSE_PROMPT = """당신은 이노티움(Innotium) 보안 솔루션 6개 제품의 정책 진단 전문가입니다.
 정책 JSON의 문제점, 충돌, 비효율, 취약점을 진단하세요.
 
 ⚠ 절대 규칙:
@@ -832,6 +1252,42 @@ DIAGNOSE_PROMPT = f"""당신은 이노티움(Innotium) 보안 솔루션 6개 제
 100점 만점 + 근거
 """
 
+KNOWLEDGE_SLOT = "{POLICY_KNOWLEDGE}"
+FEATURE_PROMPTS = {
+    "translate": TRANSLATE_PROMPT,
+    "simulate": SIMULATE_PROMPT,
+    "diagnose": DIAGNOSE_PROMPT,
+}
+
+
+@lru_cache(maxsize=None)
+def _assemble_prompt(feature, products):
+    return FEATURE_PROMPTS[feature].replace(KNOWLEDGE_SLOT, build_knowledge(products))
+
+
+def feature_prompt(feature, products_found):
+    """
+    기능 프롬프트 — products_found 에 해당하는 제품의 KB 섹션 + 공통 섹션만 포함.
+    판별하지 못한 제품(Unknown)이 있거나 제품이 없으면 6개 제품 전체.
+    (기능, 제품 조합)별로 조립 결과를 캐시한다.
+    """
+    found = set(products_found)
+    products = tuple(p for p in KB_PRODUCT_ORDER if p in found)
+    if not products or len(products) < len(found):
+        products = KB_PRODUCT_ORDER
+    return _assemble_prompt(feature, products)
+
+
+def _warm_prompts():
+    """단일 제품 / 전체 조합은 시작 시 미리 조립 (나머지 조합은 처음 쓸 때)"""
+    for feature in FEATURE_PROMPTS:
+        feature_prompt(feature, KB_PRODUCT_ORDER)
+        for product in KB_PRODUCT_ORDER:
+            feature_prompt(feature, (product,))
+
+
+_warm_prompts()
+
 
 # ═══════════════════════════════════════════════════
 # 라우트
@@ -847,94 +1303,422 @@ def serve_static(path):
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "OK", "service": "Policy Analyzer", "version": "2.0", "products": 6})
-
-@app.route('/api/translate', methods=['POST'])
-def translate_policy():
-    try:
-        data = request.json
-        policy_json = data.get('policy', '')
-        if not policy_json:
-            return jsonify({"error": "정책 JSON을 입력해주세요"}), 400
-
-        # parser.py가 알아서 처리 (깨끗한 JSON이든 더러운 로그든)
-        parsed = parse_input(policy_json)
-        policy_text = parsed['clean_json']
-
-        if parsed['policy_count'] == 0 and parsed['input_type'] == 'no_json_found':
-            return jsonify({"error": "입력에서 정책 데이터를 찾지 못했습니다. JSON 또는 에이전트 로그를 입력해주세요."}), 400
-
-        # 파싱 메타 정보를 프롬프트에 포함
-        meta = ""
-        if parsed['input_type'] not in ('clean_json', 'clean_json_array'):
-            meta = f"\n[파서 정보] 입력유형: {parsed['input_type']}, 추출 정책: {parsed['policy_count']}개, 제품: {', '.join(parsed['products_found'])}\n"
-
-        prompt = f"""{TRANSLATE_PROMPT}
+    return jsonify({"status": "OK", "service": "Policy Analyzer", "version": "2.0", "products": 6,
+                    "parse_cache": parse_cache_stats(), "analyzed_policies": ANALYZED_POLICIES.stats(),
+                    "llm_cache": LLM_CACHE.stats(), "json_codec": codec.BACKEND})
+
+# ── 분석 요청 준비 (일반 / 스트리밍 / 일괄 엔드포인트 공용) ──
+# 각 함수는 (작업 dict, None) 또는 LLM 호출 없이 바로 보낼 (None, 응답) 을 반환한다.
+# parse() 는 처음 필요할 때 입력을 파싱해 돌려준다 (입력이 없으면 None).
+# 작업의 analyzed 는 프롬프트에 실제로 들어간 정책 지문 — finish_feature 가 분석 완료로 기록한다.
+def prepare_translate(data, parse, timings):
+    parsed = parse()
+    if parsed is None:
+        return None, (jsonify({"error": "정책 JSON을 입력해주세요"}), 400)
+
+    if parsed['policy_count'] == 0 and parsed['input_type'] == 'no_json_found':
+        return None, (jsonify({"error": "입력에서 정책 데이터를 찾지 못했습니다. JSON 또는 에이전트 로그를 입력해주세요."}), 400)
+
+    parsed, skipped = skip_analyzed(parsed, 'translate', flag(data.get('skip_analyzed')))
+    if skipped and parsed['policy_count'] == 0:
+        return None, jsonify({"success": True, "result": "모든 정책이 이미 번역되었습니다 (변경 없음).",
+                              "feature": "translate", "skipped_policies": skipped})
+    policy_text, included = parsed.serialize_kept(max_chars=char_budget('translate', MODEL_NAME), timings=timings)
+
+    # 파싱 메타 정보를 프롬프트에 포함
+    meta = ""
+    if parsed['input_type'] not in ('clean_json', 'clean_json_array'):
+        meta = f"\n[파서 정보] 입력유형: {parsed['input_type']}, 추출 정책: {parsed['policy_count']}개, 제품: {', '.join(parsed['products_found'])}\n"
+
+    system_prompt = feature_prompt('translate', parsed['products_found'])
+    prompt = f"""{system_prompt}
 {meta}
 아래 정책 데이터를 분석하여 자연어로 번역해주세요:
 
 {policy_text}"""
-        return jsonify({
-            "success": True,
-            "result": call_gemini(prompt),
-            "feature": "translate",
-            "parser_info": {
-                "input_type": parsed['input_type'],
-                "policy_count": parsed['policy_count'],
-                "products": parsed['products_found']
-            }
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return {"feature": "translate", "parsed": parsed, "prompt": prompt, "skipped": skipped, "analyzed": included,
+            "cache_key": llm_cache_key('translate', system_prompt, policy_text, meta=meta)}, None
 
-@app.route('/api/simulate', methods=['POST'])
-def simulate_policy():
-    try:
-        data = request.json
-        policy_json = data.get('policy', '')
-        query = data.get('query', '')
-        if not policy_json:
-            return jsonify({"error": "정책 JSON을 입력해주세요"}), 400
-        if not query:
-            return jsonify({"error": "시뮬레이션 질의를 입력해주세요"}), 400
 
-        parsed = parse_input(policy_json)
-        policy_text = parsed['clean_json']
+def prepare_simulate(data, parse, timings):
+    query = data.get('query', '')
+    if not query:
+        return None, (jsonify({"error": "시뮬레이션 질의를 입력해주세요"}), 400)
+
+    parsed = parse()
+    if parsed is None:
+        return None, (jsonify({"error": "정책 JSON을 입력해주세요"}), 400)
+    policy_text = parsed.serialize(max_chars=char_budget('simulate', MODEL_NAME), timings=timings)
 
-        prompt = f"""{SIMULATE_PROMPT}
+    system_prompt = feature_prompt('simulate', parsed['products_found'])
+    prompt = f"""{system_prompt}
 
 정책 데이터:
 {policy_text}
 
 사용자 질의:
 {query}"""
-        return jsonify({"success": True, "result": call_gemini(prompt), "feature": "simulate"})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return {"feature": "simulate", "parsed": parsed, "prompt": prompt, "skipped": None, "analyzed": [],
+            "cache_key": llm_cache_key('simulate', system_prompt, policy_text, query=query)}, None
 
-@app.route('/api/diagnose', methods=['POST'])
-def diagnose_policy():
-    try:
-        data = request.json
-        policy_json = data.get('policy', '')
-        if not policy_json:
-            return jsonify({"error": "정책 JSON을 입력해주세요"}), 400
 
-        parsed = parse_input(policy_json)
-        policy_text = parsed['clean_json']
+def prepare_diagnose(data, parse, timings):
+    parsed = parse()
+    if parsed is None:
+        return None, (jsonify({"error": "정책 JSON을 입력해주세요"}), 400)
+
+    if parsed['policy_count'] == 0 and parsed['input_type'] == 'no_json_found':
+        return None, (jsonify({"error": "입력에서 정책 데이터를 찾지 못했습니다."}), 400)
 
-        if parsed['policy_count'] == 0 and parsed['input_type'] == 'no_json_found':
-            return jsonify({"error": "입력에서 정책 데이터를 찾지 못했습니다."}), 400
+    parsed, skipped = skip_analyzed(parsed, 'diagnose', flag(data.get('skip_analyzed')))
+    if skipped and parsed['policy_count'] == 0:
+        return None, jsonify({"success": True, "result": "모든 정책이 이미 진단되었습니다 (변경 없음).",
+                              "feature": "diagnose", "skipped_policies": skipped})
+    policy_text, included = parsed.serialize_kept(max_chars=char_budget('diagnose', MODEL_NAME), timings=timings)
 
-        prompt = f"""{DIAGNOSE_PROMPT}
+    system_prompt = feature_prompt('diagnose', parsed['products_found'])
+    prompt = f"""{system_prompt}
 
 아래 정책 데이터를 진단해주세요:
 
 {policy_text}"""
-        return jsonify({"success": True, "result": call_gemini(prompt), "feature": "diagnose"})
+    return {"feature": "diagnose", "parsed": parsed, "prompt": prompt, "skipped": skipped, "analyzed": included,
+            "cache_key": llm_cache_key('diagnose', system_prompt, policy_text)}, None
+
+
+PREPARE_FEATURES = {
+    "translate": prepare_translate,
+    "simulate": prepare_simulate,
+    "diagnose": prepare_diagnose,
+}
+
+
+def _response_info(job, cache_status, timings=None):
+    """응답 공통 필드 (feature, skipped_policies, llm_cache, parser_info)"""
+    info = {"feature": job["feature"]}
+    if job["skipped"] is not None:
+        info["skipped_policies"] = job["skipped"]
+    info["llm_cache"] = cache_status
+    info["parser_info"] = parser_info(job["parsed"], timings)
+    return info
+
+
+def begin_feature(feature):
+    """
+    요청 읽기 + 분석 준비 (일반 / 스트리밍 / asgi.py 공용) → (작업, None) 또는 (None, 바로 보낼 응답)
+    작업에는 timings, bypass(캐시 무시), report_timings(응답에 포함할 timings) 도 담는다.
+    """
+    data, stream = read_request()
+    timings = ParseTimings()
+    return prepare_feature(feature, data, lambda: parse_request(data, stream, timings), timings)
+
+
+def prepare_feature(feature, data, parse, timings):
+    job, early = PREPARE_FEATURES[feature](data, parse, timings)
+    if early is None:
+        job["timings"] = timings
+        job["bypass"] = bypasses_cache(data)
+        job["report_timings"] = timings if wants_timings(data) else None
+    return job, early
+
+
+def finish_feature(job, cache_status):
+    """LLM 응답을 끝까지 받은 뒤 — 분석 완료 기록 (프롬프트에 들어간 정책만, simulate 는 없음) + 응답 공통 필드"""
+    mark_analyzed(job["analyzed"], job["feature"])
+    return _response_info(job, cache_status, job["report_timings"])
+
+
+def run_feature(feature):
+    """일반 엔드포인트 — 전체 응답을 받은 뒤 JSON 으로"""
+    try:
+        job, early = begin_feature(feature)
+        if early is not None:
+            return early
+        result, cache_status = cached_gemini(job["prompt"], job["cache_key"], job["bypass"], job["timings"])
+        return jsonify({"success": True, "result": result, **finish_feature(job, cache_status)})
+    except Exception as e:
+        return error_response(e)
+
+
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def sse(event, payload):
+    """Server-Sent Events 한 건 (data 는 한 줄 JSON)"""
+    return f"event: {event}\ndata: {codec.dumps(payload)}\n\n"
+
+
+def stream_event(job, state, item):
+    """cached_gemini_stream 항목 ("cache" | "chunk", 값) → SSE (meta | chunk). state 에 캐시 상태 보관"""
+    kind, value = item
+    if kind == "cache":
+        state["cache"] = value
+        return sse("meta", _response_info(job, value))
+    return sse("chunk", {"text": value})
+
+
+def stream_done(job, state):
+    return sse("done", {"success": True, **finish_feature(job, state.get("cache"))})
+
+
+def stream_feature(feature):
+    """
+    스트리밍 엔드포인트 — 입력 오류/건너뜀은 일반 엔드포인트와 같은 JSON 응답,
+    그 외에는 text/event-stream: meta → chunk(텍스트 조각)… → done (실패 시 error)
+    """
+    try:
+        job, early = begin_feature(feature)
+        if early is not None:
+            return early
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+    def events():
+        state = {}
+        try:
+            for item in cached_gemini_stream(job["prompt"], job["cache_key"], job["bypass"], job["timings"]):
+                yield stream_event(job, state, item)
+            yield stream_done(job, state)
+        except Exception as e:
+            yield sse("error", {"error": str(e)})
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers=STREAM_HEADERS)
+
+
+# ═══════════════════════════════════════════════════
+# 일괄 분석 (/api/batch) — 입력 여러 개 × 기능 여러 개
+# ═══════════════════════════════════════════════════
+# 모든 입력을 먼저 파싱·준비한 뒤 Gemini 호출만 동시 실행 수 제한 안에서 돌리고,
+# 끝나는 순서대로 항목별 결과를 NDJSON 한 줄씩 보낸다 (마지막 줄은 요약).
+# 항목 하나의 입력 오류나 호출 실패는 그 항목의 줄에만 기록된다.
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '500'))
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '16'))
+BATCH_OPTIONS = ('query', 'skip_analyzed', 'bypass_cache', 'timings')  # 항목별로 덮어쓸 수 있는 공통 옵션
+
+
+def read_batch_request():
+    """
+    일괄 요청 → (공통 옵션 dict, 항목 목록, {항목 순번: 업로드 스트림})
+      - JSON: {"items": [{"id", "policy", "features", "query", ...}, ...], "features": [...], "concurrency": N}
+              items 대신 "policies": [정책 문자열, ...] 도 가능 (id 는 순번)
+      - multipart: "file" 필드 여러 개 (gzip/bz2/zip/평문, id 는 파일 이름), 옵션은 폼 필드
+    features 는 목록 또는 쉼표 구분 문자열, 없으면 translate.
+    업로드 스트림은 클라이언트가 보낸 항목 dict 와 섞지 않고 따로 돌려준다 (JSON 항목은 스트림 없음).
+    """
+    if request.mimetype == 'multipart/form-data':
+        uploads = request.files.getlist('file')
+        return (request.form.to_dict(), [{"id": upload.filename or i} for i, upload in enumerate(uploads)],
+                {i: upload.stream for i, upload in enumerate(uploads)})
+    data, stream = read_request()
+    if stream is not None or not isinstance(data, dict):
+        raise ValueError("일괄 요청은 JSON 본문 또는 multipart 파일 업로드만 지원합니다")
+    items = data.get('items')
+    if items is None:
+        items = [{"policy": policy} for policy in data.get('policies') or []]
+    if not isinstance(items, list):
+        raise ValueError("items 는 목록이어야 합니다")
+    return data, items, {}
+
+
+def _feature_list(value):
+    if isinstance(value, str):
+        value = value.split(',')
+    return [f.strip() for f in value or () if isinstance(f, str) and f.strip()]
+
+
+def _batch_concurrency(options):
+    try:
+        concurrency = int(options.get('concurrency') or BATCH_CONCURRENCY)
+    except (TypeError, ValueError):
+        raise ValueError("concurrency 는 정수여야 합니다")
+    return max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+
+
+def _parse_once(data, stream, timings):
+    """같은 입력을 여러 기능이 쓸 때 한 번만 파싱 (업로드 스트림은 다시 읽을 수 없음)"""
+    outcome = []
+
+    def parse():
+        if not outcome:
+            try:
+                outcome.append((parse_request(data, stream, timings), None))
+            except Exception as e:
+                outcome.append((None, e))
+        parsed, error = outcome[0]
+        if error is not None:
+            raise error
+        return parsed
+    return parse
+
+
+def _early_payload(early):
+    """prepare_* 의 바로 보낼 응답 (jsonify[, 상태]) → 본문 dict"""
+    return app.make_response(early).get_json()
+
+
+def begin_batch():
+    """
+    일괄 요청 읽기 + 전체 파싱·준비 → (작업 목록, 동시 실행 수). 요청 자체가 잘못되면 ValueError.
+    작업: {"index", "id", "feature"} + 준비된 "job" 또는 준비 단계에서 끝난 "payload"
+    """
+    options, items, streams = read_batch_request()
+    if not items:
+        raise ValueError("분석할 항목이 없습니다 (items 또는 policies)")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise ValueError(f"항목이 너무 많습니다: {len(items)}개 (최대 {BATCH_MAX_ITEMS}개)")
+    concurrency = _batch_concurrency(options)
+    default_features = _feature_list(options.get('features') or options.get('feature')) or ['translate']
+
+    tasks = []
+    for i, item in enumerate(items):
+        if isinstance(item, str):
+            item = {"policy": item}
+        if not isinstance(item, dict):
+            tasks.append({"index": len(tasks), "id": i, "feature": None,
+                          "payload": {"error": "항목은 정책 문자열 또는 객체여야 합니다"}})
+            continue
+        data = {k: options[k] for k in BATCH_OPTIONS if k in options}
+        data.update(item)
+        timings = ParseTimings()
+        parse = _parse_once(data, streams.get(i), timings)
+        features = _feature_list(item.get('features') or item.get('feature')) or default_features
+        for n, feature in enumerate(features):
+            task = {"index": len(tasks), "id": item.get('id', i), "feature": feature}
+            if feature not in PREPARE_FEATURES:
+                task["payload"] = {"error": f"지원하지 않는 기능: {feature}"}
+            else:
+                try:
+                    job, early = prepare_feature(feature, data, parse, timings if n == 0 else ParseTimings())
+                    if early is not None:
+                        task["payload"] = _early_payload(early)
+                    else:
+                        task["job"] = job
+                except Exception as e:
+                    task["payload"] = {"error": str(e)}
+            tasks.append(task)
+    return tasks, concurrency
+
+
+def _batch_groups(tasks):
+    """LLM 호출이 필요한 작업을 같은 프롬프트(캐시 키)끼리 묶음 — 묶음마다 한 번만 호출"""
+    groups = {}
+    for task in tasks:
+        if "job" in task:
+            job = task["job"]
+            groups.setdefault((job["cache_key"], job["bypass"]), []).append(task)
+    return list(groups.values())
+
+
+def _batch_line(task, payload, counts):
+    counts["succeeded" if payload.get("success") else "failed"] += 1
+    return codec.dumps({"index": task["index"], "id": task["id"], "feature": task["feature"], **payload}) + "\n"
+
+
+def _group_lines(group, outcome, error, counts):
+    """묶음 하나의 호출 결과 → 작업별 NDJSON 줄 (같은 묶음의 나머지 작업은 캐시 적중으로 표시)"""
+    for n, task in enumerate(group):
+        if error is not None:
+            payload = {"error": str(error)}
+        else:
+            result, cache_status = outcome
+            payload = {"success": True, "result": result,
+                       **finish_feature(task["job"], cache_status if n == 0 else "hit")}
+        yield _batch_line(task, payload, counts)
+
+
+def _batch_summary(tasks, groups, counts, start):
+    return codec.dumps({"done": True, "total": len(tasks), **counts, "llm_calls": len(groups),
+                        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)}) + "\n"
+
+
+def run_batch(tasks, concurrency):
+    """준비된 작업을 concurrency 개 스레드로 실행 → 끝나는 순서대로 NDJSON 줄"""
+    start = time.perf_counter()
+    counts = {"succeeded": 0, "failed": 0}
+    groups = _batch_groups(tasks)
+    for task in tasks:
+        if "payload" in task:
+            yield _batch_line(task, task["payload"], counts)
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        futures = {}
+        for group in groups:
+            job = group[0]["job"]
+            futures[pool.submit(cached_gemini, job["prompt"], job["cache_key"], job["bypass"],
+                                job["timings"])] = group
+        for future in as_completed(futures):
+            error = future.exception()
+            yield from _group_lines(futures[future], None if error else future.result(), error, counts)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)  # 클라이언트가 끊으면 남은 호출 취소
+    yield _batch_summary(tasks, groups, counts, start)
+
+
+async def run_batch_async(tasks, concurrency):
+    """run_batch 의 비동기 버전 (asgi.py) — 동시 호출 수는 세마포어로 제한"""
+    start = time.perf_counter()
+    counts = {"succeeded": 0, "failed": 0}
+    groups = _batch_groups(tasks)
+    for task in tasks:
+        if "payload" in task:
+            yield _batch_line(task, task["payload"], counts)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(group):
+        job = group[0]["job"]
+        async with semaphore:
+            try:
+                return group, await cached_gemini_async(job["prompt"], job["cache_key"], job["bypass"],
+                                                        job["timings"]), None
+            except Exception as e:
+                return group, None, e
+
+    pending = [asyncio.ensure_future(call(group)) for group in groups]
+    try:
+        for next_done in asyncio.as_completed(pending):
+            for line in _group_lines(*await next_done, counts):
+                yield line
+    finally:
+        for future in pending:
+            future.cancel()
+    yield _batch_summary(tasks, groups, counts, start)
+
+
+def batch_feature():
+    try:
+        tasks, concurrency = begin_batch()
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e)
+    return Response(stream_with_context(run_batch(tasks, concurrency)), mimetype='application/x-ndjson',
+                    headers=STREAM_HEADERS)
+
+
+@app.route('/api/translate', methods=['POST'])
+def translate_policy():
+    return run_feature('translate')
+
+@app.route('/api/simulate', methods=['POST'])
+def simulate_policy():
+    return run_feature('simulate')
+
+@app.route('/api/diagnose', methods=['POST'])
+def diagnose_policy():
+    return run_feature('diagnose')
+
+@app.route('/api/<feature>/stream', methods=['POST'])
+def stream_policy(feature):
+    if feature not in PREPARE_FEATURES:
+        return jsonify({"error": f"지원하지 않는 기능: {feature}"}), 404
+    return stream_feature(feature)
 
+@app.route('/api/batch', methods=['POST'])
+def batch_policy():
+    return batch_feature()
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,235 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  asgi.py — 비동기(ASGI) 진입점                                ║
+║  Gemini 응답을 기다리는 동안 워커 스레드를 붙잡지 않음         ║
+╚══════════════════════════════════════════════════════════════╝
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+    python asgi.py
+
+분석 엔드포인트 (/api/translate|simulate|diagnose, /api/<기능>/stream):
+  요청 읽기·파싱·프롬프트 준비(begin_feature)만 스레드 풀에서 실행하고
+  Gemini 는 SDK 비동기 클라이언트로 await — 한 프로세스가 수백 건의 분석을 동시에 기다릴 수 있다.
+일괄 분석 (/api/batch): 전체 준비는 스레드 풀, 항목별 호출은 run_batch_async (세마포어로 동시 수 제한).
+그 외 경로 (/, 정적 파일, /health, 404/405) 는 기존 Flask 앱을 스레드 풀에서 그대로 실행.
+요청 본문은 ASGI_SPOOL_BYTES (기본 1MB) 까지 메모리, 넘으면 임시 파일로 받은 뒤 처리한다.
+"""
+
+import asyncio
+import os
+import re
+import sys
+import tempfile
+
+import codec
+from app import (app as flask_app, error_response, begin_feature, finish_feature, begin_batch,
+                 run_batch_async, cached_gemini_async, cached_gemini_stream_async, sse, stream_event,
+                 stream_done, STREAM_HEADERS)
+
+SPOOL_BYTES = int(os.getenv('ASGI_SPOOL_BYTES', str(1 << 20)))
+_ANALYZE_ROUTE = re.compile(r"/api/(translate|simulate|diagnose)(/stream)?")
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return  # websocket 미지원
+
+    body, length = await _read_body(receive)
+    try:
+        environ = wsgi_environ(scope, body, length)
+        match = _ANALYZE_ROUTE.fullmatch(scope["path"])
+        if match and scope["method"] == "POST":
+            await _analyze(match.group(1), bool(match.group(2)), environ, send)
+        elif scope["path"] == "/api/batch" and scope["method"] == "POST":
+            await _batch(environ, send)
+        else:
+            await _send_response(send, *await asyncio.to_thread(_call_flask, environ))
+    finally:
+        body.close()
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def _read_body(receive):
+    """요청 본문 전체 → (파일 객체, 바이트 수)"""
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body.write(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    length = body.tell()
+    body.seek(0)
+    return body, length
+
+
+def wsgi_environ(scope, body, length):
+    """ASGI http scope + 받아 둔 본문 → WSGI environ (Flask 요청 컨텍스트용)"""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "CONTENT_LENGTH": str(length),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").lower()
+        value = value.decode("latin-1")
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+        elif name not in ("content-length", "transfer-encoding"):  # 본문은 이미 다 받았음
+            key = "HTTP_" + name.upper().replace("-", "_")
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _call_flask(environ):
+    """(스레드) Flask 앱 그대로 실행 → (상태 코드, 헤더, 본문)"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = headers
+
+    chunks = flask_app(environ, start_response)
+    try:
+        body = b"".join(chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return started["status"], started["headers"], body
+
+
+def _prepare(feature, streaming, environ):
+    """
+    (스레드) Flask 요청 컨텍스트에서 begin_feature → (작업, 응답 머리) 또는 (None, 완성된 응답)
+    응답 머리는 빈 응답을 after_request(CORS 등) 에 통과시켜 얻은 상태/헤더
+    """
+    with flask_app.request_context(environ):
+        try:
+            job, early = begin_feature(feature)
+        except Exception as e:
+            job, early = None, error_response(e)
+        if early is not None:
+            return None, _response_parts(flask_app.make_response(early))
+        if streaming:
+            return job, _response_parts(flask_app.response_class(mimetype='text/event-stream',
+                                                                 headers=STREAM_HEADERS))
+        return job, _response_parts(flask_app.response_class(mimetype='application/json'))
+
+
+def _prepare_batch(environ):
+    """(스레드) _prepare 의 일괄 버전 → ((작업 목록, 동시 실행 수), 응답 머리) 또는 (None, 완성된 응답)"""
+    with flask_app.request_context(environ):
+        try:
+            prepared = begin_batch()
+        except ValueError as e:
+            return None, _response_parts(flask_app.make_response(error_response(e, 400)))
+        except Exception as e:
+            return None, _response_parts(flask_app.make_response(error_response(e)))
+        return prepared, _response_parts(flask_app.response_class(mimetype='application/x-ndjson',
+                                                                  headers=STREAM_HEADERS))
+
+
+def _response_parts(response):
+    response = flask_app.process_response(response)
+    return response.status_code, response.headers.to_wsgi_list(), response.get_data()
+
+
+async def _analyze(feature, streaming, environ, send):
+    job, (status, headers, body) = await asyncio.to_thread(_prepare, feature, streaming, environ)
+    if job is None:
+        await _send_response(send, status, headers, body)
+        return
+    if streaming:
+        await _stream(job, headers, send)
+        return
+    try:
+        result, cache_status = await cached_gemini_async(job["prompt"], job["cache_key"],
+                                                         job["bypass"], job["timings"])
+        payload = {"success": True, "result": result, **finish_feature(job, cache_status)}
+    except Exception as e:
+        status, payload = 500, {"error": str(e)}
+    await _send_response(send, status, headers, codec.dumps(payload).encode("utf-8"))
+
+
+async def _stream(job, headers, send):
+    """text/event-stream: meta → chunk… → done (실패 시 error) — stream_feature 와 같은 이벤트"""
+    await send({"type": "http.response.start", "status": 200, "headers": _encode_headers(headers)})
+    state = {}
+    events = cached_gemini_stream_async(job["prompt"], job["cache_key"], job["bypass"], job["timings"])
+    try:
+        async for item in events:
+            await _send_text(send, stream_event(job, state, item))
+        await _send_text(send, stream_done(job, state))
+    except Exception as e:
+        await _send_text(send, sse("error", {"error": str(e)}))
+    finally:
+        await events.aclose()
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _batch(environ, send):
+    prepared, (status, headers, body) = await asyncio.to_thread(_prepare_batch, environ)
+    if prepared is None:
+        await _send_response(send, status, headers, body)
+        return
+    await send({"type": "http.response.start", "status": 200, "headers": _encode_headers(headers)})
+    lines = run_batch_async(*prepared)
+    try:
+        async for line in lines:
+            await _send_text(send, line)
+    finally:
+        await lines.aclose()  # 끊기면 남은 호출 취소
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _send_text(send, text):
+    await send({"type": "http.response.body", "body": text.encode("utf-8"), "more_body": True})
+
+
+async def _send_response(send, status, headers, body):
+    await send({"type": "http.response.start", "status": status,
+                "headers": _encode_headers(headers, len(body))})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _encode_headers(headers, length=None):
+    """WSGI 헤더 목록 → ASGI (Content-Length 는 실제 본문 기준으로 다시, 스트리밍이면 생략)"""
+    encoded = [(k.lower().encode("latin-1"), v.encode("latin-1"))
+               for k, v in headers if k.lower() != "content-length"]
+    if length is not None:
+        encoded.append((b"content-length", str(length).encode("latin-1")))
+    return encoded
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(application, host='0.0.0.0', port=int(os.getenv('PORT', '5000')))
@@ -0,0 +1,165 @@
+"""
+bench_async.py — 동기(Flask 스레드) vs 비동기(asgi.py) 부하 비교, 로컬 스텁 모델 사용
+
+    python benchmarks/bench_async.py --requests 400 --concurrency 200 --threads 8 --latency 1.0
+
+Gemini 대신 latency 초(± jitter) 동안 잠자는 스텁으로 바꾸고 (API 키/네트워크 불필요)
+동시에 concurrency 개 클라이언트가 POST /api/<기능> 을 보낸다. 응답 캐시는 bypass.
+sync : Flask WSGI 앱을 threads 개 스레드 풀에서 실행 (gunicorn gthread 워커 하나와 같은 조건)
+async: asgi.application 을 이벤트 루프에서 직접 호출
+HTTP 계층 없이 앱만 측정하므로 두 방식의 차이는 요청당 스레드 점유 여부에서 나온다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "stub")  # 클라이언트 생성용 (실제 호출 없음)
+
+from werkzeug.test import EnvironBuilder  # noqa: E402
+
+import app  # noqa: E402
+import asgi  # noqa: E402
+from synth import make_json_export  # noqa: E402
+
+STUB_TEXT = "## 정책 요약\n스텁 모델 응답입니다.\n"
+
+
+class StubModel:
+    """_generate / _generate_async 대체 — 잠자는 시간과 동시 호출 수 기록"""
+
+    def __init__(self, latency, jitter, seed):
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def _delay(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _done(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def generate(self, prompt):
+        time.sleep(self._delay())
+        self._done()
+        return STUB_TEXT
+
+    async def generate_async(self, prompt):
+        await asyncio.sleep(self._delay())
+        self._done()
+        return STUB_TEXT
+
+    def install(self):
+        app._generate = self.generate
+        app._generate_async = self.generate_async
+
+
+def _run_sync(path, body):
+    environ = EnvironBuilder(path=path, method="POST", data=body,
+                             content_type="application/json").get_environ()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+
+    b"".join(app.app(environ, start_response))
+    return started["status"]
+
+
+async def _run_async(path, body):
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"",
+             "headers": [(b"content-type", b"application/json")], "http_version": "1.1",
+             "scheme": "http", "server": ("bench", 80), "client": ("127.0.0.1", 0)}
+    messages = iter([{"type": "http.request", "body": body, "more_body": False}])
+    started = {}
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            started["status"] = message["status"]
+
+    await asgi.application(scope, receive, send)
+    return started["status"]
+
+
+async def load(mode, n_requests, concurrency, threads, path, body):
+    """concurrency 개 클라이언트가 n_requests 건을 나눠 순서대로 전송 → (요청별 지연, 상태 코드, 전체 시간)"""
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=threads) if mode == "sync" else None
+    latencies, statuses = [], []
+    remaining = iter(range(n_requests))
+
+    async def client():
+        for _ in remaining:
+            start = time.perf_counter()
+            if mode == "sync":
+                status = await loop.run_in_executor(pool, _run_sync, path, body)
+            else:
+                status = await _run_async(path, body)
+            latencies.append(time.perf_counter() - start)
+            statuses.append(status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    if pool is not None:
+        pool.shutdown()
+    return latencies, statuses, elapsed
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--concurrency", type=int, default=200, help="동시 클라이언트 수")
+    ap.add_argument("--threads", type=int, default=8, help="sync 방식 워커 스레드 수")
+    ap.add_argument("--latency", type=float, default=1.0, help="스텁 모델 응답 시간 (초)")
+    ap.add_argument("--jitter", type=float, default=0.2)
+    ap.add_argument("--feature", default="translate", choices=sorted(app.PREPARE_FEATURES))
+    ap.add_argument("--policies", type=int, default=20, help="요청당 정책 수")
+    ap.add_argument("--modes", default="sync,async")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    payload = {"policy": make_json_export(args.policies, args.seed), "bypass_cache": True}
+    if args.feature == "simulate":
+        payload["query"] = "관리자가 USB 에 파일을 복사하면?"
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    path = f"/api/{args.feature}"
+    print(f"요청 {args.requests:,}건, 동시 클라이언트 {args.concurrency}, 스텁 지연 "
+          f"{args.latency:.2f}±{args.jitter:.2f}s, 본문 {len(body) / 1e3:.1f} KB")
+
+    for mode in (m.strip() for m in args.modes.split(",") if m.strip()):
+        stub = StubModel(args.latency, args.jitter, args.seed)
+        stub.install()
+        latencies, statuses, elapsed = asyncio.run(
+            load(mode, args.requests, args.concurrency, args.threads, path, body))
+        failed = sum(1 for s in statuses if s != 200)
+        label = f"sync({args.threads} 스레드)" if mode == "sync" else "async"
+        print(f"  {label:<14} {elapsed:7.2f}s  {len(latencies) / elapsed:7.1f} req/s  "
+              f"p50 {_percentile(latencies, 0.50):6.2f}s  p99 {_percentile(latencies, 0.99):6.2f}s  "
+              f"최대 동시 모델 호출 {stub.peak:4d}" + (f"  실패 {failed}" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+bench_codec.py — JSON 코덱 비교 (표준 json vs orjson)
+
+    python benchmarks/bench_codec.py --size 4M --policies 2000
+
+같은 입력을 codec.set_backend("json") / ("orjson") 로 바꿔가며 측정한다.
+작업: 로그 Policy= 디코딩, 관리 콘솔 내보내기 디코딩, 예산 직렬화(pretty/compact),
+      정책 지문, 파싱 캐시 페이로드 왕복
+orjson 이 설치되지 않았으면 json 만 측정한다.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codec  # noqa: E402
+import parser  # noqa: E402
+from synth import make_json_export, make_sized_log, parse_size  # noqa: E402
+
+
+def _best(repeat, fn):
+    best = None
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def _entry_data(result):
+    entries, signs, errors = result
+    return [e.data for e in entries], signs, errors
+
+
+def workloads(log_text, export, budget):
+    """(이름, 입력 바이트 수, 함수, 결과 비교용 변환) 목록"""
+    policies = parser.parse_input(export)["policies"]
+    cache_payload = parser._result_to_cache(parser.parse_input(log_text))
+    datas = [e.data for e in parser.extract_json_from_log(log_text)[0]]
+    return [
+        ("log_extract", len(log_text.encode("utf-8")),
+         lambda: parser.extract_json_from_log(log_text), _entry_data),
+        ("export_decode", len(export.encode("utf-8")),
+         lambda: parser.classify_input(export), None),
+        ("budget_pretty", 0,
+         lambda: parser.budget_serialize(policies, budget, pretty=True), len),
+        ("budget_compact", 0,
+         lambda: parser.budget_serialize(policies, None, pretty=False), len),
+        ("fingerprint", 0,
+         lambda: [parser.policy_fingerprint(d) for d in datas], None),
+        ("cache_roundtrip", 0,
+         lambda: codec.loads(codec.dumps(cache_payload)), None),
+    ]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--size", default="4M", help="합성 로그 크기 (예: 1M, 16M)")
+    ap.add_argument("--policies", type=int, default=2000, help="JSON 내보내기 정책 수")
+    ap.add_argument("--policy-ratio", type=float, default=0.2)
+    ap.add_argument("--budget", type=int, default=parser.DEFAULT_CHAR_BUDGET)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    log_text = make_sized_log(parse_size(args.size), args.seed, args.policy_ratio)
+    export = make_json_export(args.policies, args.seed)
+    backends = ["json"] + (["orjson"] if codec.orjson is not None else [])
+    print(f"합성 로그 {len(log_text.encode('utf-8')) / 1e6:.1f} MB, 내보내기 정책 {args.policies:,}개, "
+          f"코덱: {', '.join(backends)}")
+
+    results = {}
+    for backend in backends:
+        codec.set_backend(backend)
+        for name, n_bytes, fn, view in workloads(log_text, export, args.budget):
+            seconds, value = _best(args.repeat, fn)
+            results[name, backend] = (seconds, n_bytes, view(value) if view else value)
+    codec.set_backend("auto")
+
+    for name, *_ in workloads(log_text, export, args.budget):
+        base_seconds, n_bytes, base_value = results[name, "json"]
+        line = f"  {name:<16} json {base_seconds * 1e3:9.2f} ms"
+        if n_bytes:
+            line += f" ({n_bytes / base_seconds / 1e6:6.1f} MB/s)"
+        if "orjson" in backends:
+            seconds, _, value = results[name, "orjson"]
+            line += f"  orjson {seconds * 1e3:9.2f} ms  ({base_seconds / seconds:.2f}x)"
+            if value != base_value:
+                line += "  ※ 결과 다름"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
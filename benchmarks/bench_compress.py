@@ -0,0 +1,140 @@
+"""
+bench_compress.py — compress_and_mask 속도 비교 (대형 목록 정책)
+
+    python benchmarks/bench_compress.py --items 10000 --policies 20
+
+before: 모든 노드를 다시 만들고 필드마다 리스트 in 검사하던 기존 구현 (아래 _legacy_*)
+after : parser.compress_and_mask (필드→처리 함수 표 + 바뀌지 않은 하위 객체 공유)
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser  # noqa: E402
+
+
+def _legacy_compress_and_mask(data):
+    """변경 전 compress_and_mask (비교 기준)"""
+    if isinstance(data, dict):
+        result = {}
+        for key, value in data.items():
+            if key in parser.SENSITIVE_FIELDS:
+                result[key] = "***설정됨***" if value and str(value).strip() else "미설정"
+                continue
+            if key in parser.COMPRESSIBLE_FIELDS and isinstance(value, list):
+                result[key] = _legacy_compact_list(key, value)
+                continue
+            result[key] = _legacy_compress_and_mask(value)
+        return result
+    elif isinstance(data, list):
+        return [_legacy_compress_and_mask(item) for item in data]
+    return data
+
+
+def _legacy_compact_list(key, items):
+    if not items:
+        return []
+    compacted = []
+    for item in items:
+        if not isinstance(item, dict):
+            compacted.append(item)
+            continue
+        if "processName" in item:
+            name = item.get("processName", "?")
+            sign = item.get("signs", item.get("sign", ""))
+            sha2 = item.get("sha2s", item.get("sha2", ""))
+            parts = [name]
+            if sign:
+                parts.append(f"서명:{sign}")
+            if sha2:
+                parts.append("SHA2:있음")
+            if item.get("isPassUncon"):
+                parts.append("무조건허용")
+            compacted.append(" | ".join(parts))
+            continue
+        if "url" in item or "address" in item:
+            compacted.append(item.get("url", item.get("address", "?")))
+            continue
+        if "extension" in item:
+            compacted.append(item.get("extension", "?"))
+            continue
+        if "triggerValue" in item or "processName" in item:
+            compacted.append(item.get("triggerValue", item.get("processName", "?")))
+            continue
+        parts = []
+        for k, v in item.items():
+            if k.startswith("_"):
+                continue
+            if v is None or v == "" or v == []:
+                continue
+            if isinstance(v, (dict, list)):
+                continue
+            parts.append(f"{k}={v}")
+        compacted.append(" | ".join(parts) if parts else str(item))
+    return {"_총개수": len(items), "_전체목록": compacted}
+
+
+def make_policies(n_policies, n_items, seed=0):
+    """exceptProcessList / controlSuiteWebRestrictList 가 n_items 개인 정책 + 중첩 설정"""
+    rng = random.Random(seed)
+    policies = []
+    for i in range(n_policies):
+        policies.append({
+            "szAgentPolicyId": i,
+            "szAgentPolicyName": f"정책_{i}",
+            "storageAccountPassword": "secret" if i % 2 else "",
+            "exceptProcessList": [
+                {"processName": f"app{n}.exe", "signs": rng.choice(["microsoft", ""]),
+                 "sha2s": rng.choice(["ab" * 32, ""]), "isPassUncon": n % 7 == 0}
+                for n in range(n_items)
+            ],
+            "controlSuiteWebRestrictList": [
+                {"url": f"https://site{n}.example.com", "type": n % 3}
+                for n in range(n_items)
+            ],
+            "options": {
+                "schedule": [{"day": d, "hours": list(range(24))} for d in range(7)],
+                "folders": [f"C:\\Data\\{n}" for n in range(200)],
+                "settings": {f"option{n}": n % 5 for n in range(2000)},
+            },
+        })
+    return policies
+
+
+def _run(fn, policies, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for policy in policies:
+            fn(policy)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--items", type=int, default=10000, help="목록 필드당 항목 수")
+    ap.add_argument("--policies", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    policies = make_policies(args.policies, args.items, args.seed)
+    assert all(_legacy_compress_and_mask(p) == parser.compress_and_mask(p) for p in policies), "결과 불일치"
+
+    before = _run(_legacy_compress_and_mask, policies, args.repeat)
+    after = _run(parser.compress_and_mask, policies, args.repeat)
+    n = len(policies)
+    print(f"정책 {n}개 × 목록 {args.items:,}항목 ×2")
+    print(f"  before: {before / n * 1e3:8.2f} ms/policy")
+    print(f"  after : {after / n * 1e3:8.2f} ms/policy  ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+bench_entry_memory.py — 추출 엔트리 메모리/GC 비교 (tracemalloc)
+
+    python benchmarks/bench_entry_memory.py --lines 1000000 --policy-ratio 0.2
+
+before: 엔트리마다 dict + 줄마다 잘라낸 컨텍스트 문자열, io.StringIO 줄 순회 (아래 _legacy_extract)
+after : parser.extract_json_from_log (PolicyEntry __slots__ + intern 문자열, 구간 split 줄 순회)
+"""
+
+import argparse
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser  # noqa: E402
+from synth import make_agent_log  # noqa: E402
+
+
+def _legacy_extract(raw_text):
+    """변경 전 엔트리 표현 (비교 기준) — 스캐너 결과를 예전 dict 형태로 보관"""
+    extracted, sign_policies, errors = [], [], []
+    for kind, item in parser._scan_lines(enumerate(io.StringIO(raw_text), 1)):
+        if kind == "entry":
+            # intern 되지 않은 줄별 컨텍스트 사본
+            extracted.append({"_source": item.source, "_line": item.line,
+                              "_context": item.context.encode().decode(), "_data": item.data})
+        elif kind == "sign":
+            sign_policies.append(item)
+        else:
+            errors.append(item)
+    return extracted, sign_policies, errors
+
+
+class _GCTimer:
+    """gc.callbacks 로 수집 시간/횟수 누적"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.collections = 0
+        self._start = 0.0
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.seconds += time.perf_counter() - self._start
+            self.collections += 1
+
+
+def measure(fn, text):
+    gc.collect()
+    timer = _GCTimer()
+    gc.callbacks.append(timer)
+    tracemalloc.start()
+    start = time.perf_counter()
+    entries, _, _ = fn(text)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.callbacks.remove(timer)
+    count = len(entries)
+    del entries
+    gc.collect()
+    return {"entries": count, "current_mb": current / 1e6, "peak_mb": peak / 1e6,
+            "gc_seconds": timer.seconds, "gc_collections": timer.collections, "seconds": elapsed}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--lines", type=int, default=1_000_000)
+    ap.add_argument("--policy-ratio", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    text = make_agent_log(args.lines, args.seed, args.policy_ratio)
+    print(f"합성 로그: {args.lines:,}줄, {len(text.encode('utf-8')) / 1e6:.1f} MB "
+          f"(tracemalloc 켜진 상태라 시간은 상대 비교용)")
+    for name, fn in (("before", _legacy_extract), ("after", parser.extract_json_from_log)):
+        r = measure(fn, text)
+        print(f"  {name:<6}: 엔트리 {r['entries']:,}개, 유지 {r['current_mb']:8.1f} MB, "
+              f"피크 {r['peak_mb']:8.1f} MB, GC {r['gc_seconds']:.3f}s ({r['gc_collections']}회), "
+              f"{r['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
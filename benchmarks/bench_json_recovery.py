@@ -0,0 +1,98 @@
+"""
+bench_json_recovery.py — Policy= 페이로드 JSON 복구 속도/복구율 비교
+
+    python benchmarks/bench_json_recovery.py --payloads 20000
+
+before: json.loads 를 최대 3번 시도하던 기존 _safe_parse_json (아래 _legacy_safe_parse_json)
+after : parser.recover_json (raw_decode 1회 + 문자열 인식 꼬리 보정)
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser  # noqa: E402
+
+
+def _legacy_safe_parse_json(json_str):
+    """변경 전 _safe_parse_json (비교 기준)"""
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        pass
+    try:
+        depth = 0
+        end_idx = 0
+        for i, ch in enumerate(json_str):
+            if ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+            if depth == 0 and i > 0:
+                end_idx = i + 1
+                break
+        if end_idx > 0:
+            return json.loads(json_str[:end_idx])
+    except (json.JSONDecodeError, IndexError):
+        pass
+    try:
+        last_brace = json_str.rfind('}')
+        if last_brace > 0:
+            return json.loads(json_str[:last_brace + 1])
+    except json.JSONDecodeError:
+        pass
+    return None
+
+
+def _policy(rng, i):
+    return {
+        "szAgentPolicyId": i,
+        "szAgentPolicyName": f"정책_{i}",
+        "textLetter": "{대외비} 무단 반출 금지 {user}",
+        "manageFolder": "C:\\Users\\{user}\\Documents",
+        "exceptProcessList": [
+            {"processName": f"app{n}.exe", "signs": "microsoft"} for n in range(rng.randint(1, 40))
+        ],
+    }
+
+
+def make_payloads(n, seed=0):
+    """유형별 페이로드 목록: clean / garbage_suffix / truncated"""
+    rng = random.Random(seed)
+    sets = {"clean": [], "garbage_suffix": [], "truncated": []}
+    for i in range(n):
+        text = json.dumps(_policy(rng, i), ensure_ascii=False)
+        sets["clean"].append(text)
+        sets["garbage_suffix"].append(text + rng.choice([" }", ", type=0 }}", " [itError]:{x}"]))
+        sets["truncated"].append(text[:rng.randint(len(text) // 2, len(text) - 1)])
+    return sets
+
+
+def _run(fn, payloads):
+    start = time.perf_counter()
+    recovered = sum(1 for p in payloads if fn(p))
+    return time.perf_counter() - start, recovered
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--payloads", type=int, default=20000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for name, payloads in make_payloads(args.payloads, args.seed).items():
+        before, before_ok = _run(_legacy_safe_parse_json, payloads)
+        after, after_ok = _run(parser._safe_parse_json, payloads)
+        n = len(payloads)
+        print(f"[{name}]")
+        print(f"  before: {before / n * 1e6:8.1f} us/payload, 복구 {before_ok:,}/{n:,}")
+        print(f"  after : {after / n * 1e6:8.1f} us/payload, 복구 {after_ok:,}/{n:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+bench_parallel.py — 대용량 로그 병렬 파싱 스케일링 (workers 1 → N)
+
+    python benchmarks/bench_parallel.py --lines 2000000 --max-workers 8
+
+같은 합성 로그 파일을 parse_log_file(workers=k) 로 파싱하고,
+결과가 순차 처리(workers=1)와 동일한지 확인한다.
+구간 병합 후 엔트리/에러의 줄번호가 순차 처리와 같은지도 파일·문자열 입력 모두 확인한다.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser  # noqa: E402
+from synth import generate_agent_log  # noqa: E402
+
+
+def _line_numbers(collected):
+    seen, _, errors = collected
+    return sorted(entry.line for entry in seen.values()), [error["_line"] for error in errors]
+
+
+def check_line_numbers(path, workers):
+    """병렬 구간 병합(파일/문자열) 줄번호 == 순차 스캔 줄번호"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    expected = _line_numbers(parser._collect_log_events(parser._scan_lines(parser._iter_text_lines(text))))
+    for name, scan_chunk, chunks in (
+        ("file", parser._scan_file_chunk, parser._file_chunks(path, "utf-8", workers)),
+        ("text", parser._scan_text_chunk, parser._text_chunks(text, workers)),
+    ):
+        actual = _line_numbers(parser._collect_parallel(scan_chunk, chunks, workers))
+        assert actual == expected, f"병렬({name}) 줄번호가 순차 처리와 다릅니다"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--lines", type=int, default=2_000_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "agent.log")
+        with open(path, "w", encoding="utf-8") as f:
+            for line in generate_agent_log(args.lines, args.seed):
+                f.write(line + "\n")
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"합성 로그: {args.lines:,}줄, {size_mb:.1f} MB, CPU {os.cpu_count()}개")
+
+        baseline = None
+        base_time = None
+        workers = 1
+        while workers <= args.max_workers:
+            start = time.perf_counter()
+            result = parser.parse_log_file(path, workers=workers)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline, base_time = result, elapsed
+            else:
+                assert result["policies"] == baseline["policies"], "병렬 결과가 순차 결과와 다릅니다"
+                assert result["errors"] == baseline["errors"], "병렬 에러 목록이 순차 결과와 다릅니다"
+                check_line_numbers(path, workers)
+            print(f"workers={workers:<3} {elapsed:7.2f}s  {size_mb / elapsed:7.1f} MB/s  "
+                  f"x{base_time / elapsed:.2f}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
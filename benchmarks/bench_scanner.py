@@ -0,0 +1,89 @@
+"""
+bench_scanner.py — 로그 라인 스캐너 처리량 (lines/sec) 비교
+
+    python benchmarks/bench_scanner.py --lines 1000000
+
+before: 줄마다 5개 정규식을 모두 실행하던 기존 구현 (아래 _legacy_scan)
+after : parser._scan_lines (부분문자열 사전필터 + 사전 컴파일 앵커 패턴)
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser  # noqa: E402
+from synth import make_agent_log  # noqa: E402
+
+
+def _legacy_scan(raw_text):
+    """변경 전 extract_json_from_log 의 줄 처리 로직 (비교 기준)"""
+    extracted, sign_policies, errors = [], [], []
+    for line_num, line in enumerate(raw_text.split('\n'), 1):
+        line = line.strip()
+        if not line:
+            continue
+        for match in re.finditer(r'Policy=(\{.+)', line):
+            parsed = parser._safe_parse_json(match.group(1))
+            if parsed:
+                context = line[:line.find('Policy=')].strip().rstrip(',')
+                extracted.append({"_source": "log", "_line": line_num,
+                                  "_context": context, "_data": parsed})
+        if '"policy"' in line and 'Policy=' not in line:
+            for match in re.finditer(r'"policy"\s*:\s*(\{.+?\})\s*[,}]', line):
+                parsed = parser._safe_parse_json(match.group(1))
+                if parsed:
+                    extracted.append({"_source": "log_inner", "_line": line_num,
+                                      "_context": "embedded_policy", "_data": parsed})
+        if line.startswith('{'):
+            parsed = parser._safe_parse_json(line)
+            if parsed:
+                extracted.append({"_source": "standalone", "_line": line_num,
+                                  "_context": "", "_data": parsed})
+        sign_match = re.match(r'.*Sign Except Policy,\s*sign=(.+?),\s*type=(\d+)', line)
+        if sign_match:
+            sign_policies.append({"sign": sign_match.group(1).strip(),
+                                  "type": int(sign_match.group(2))})
+        error_match = re.match(r'.*\[itError\]:(.+)', line)
+        if error_match:
+            errors.append({"_line": line_num, "_message": error_match.group(1).strip()})
+    return extracted, sign_policies, errors
+
+
+def _time(fn, text, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--lines", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    text = make_agent_log(args.lines, args.seed)
+    print(f"합성 로그: {args.lines:,}줄, {len(text.encode('utf-8')) / 1e6:.1f} MB")
+
+    before, expected = _time(_legacy_scan, text, args.repeat)
+    after, actual = _time(parser.extract_json_from_log, text, args.repeat)
+    # 서명 예외 / 에러 줄은 동일해야 함. 정책 추출은 잘린 JSON·중첩 "policy" 복구가
+    # 개선되어 합성 로그의 손상 줄에서 차이가 날 수 있으므로 개수만 보고한다.
+    assert actual[1:] == expected[1:], "스캐너 결과가 기존 구현과 다릅니다"
+    print(f"추출 정책: before {len(expected[0]):,}개 / after {len(actual[0]):,}개")
+
+    print(f"before: {args.lines / before:>12,.0f} lines/sec ({before:.2f}s)")
+    print(f"after : {args.lines / after:>12,.0f} lines/sec ({after:.2f}s)")
+    print(f"speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
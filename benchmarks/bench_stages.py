@@ -0,0 +1,179 @@
+"""
+bench_stages.py — 파이프라인 단계별 마이크로 벤치마크 (결과 JSON 저장 / 이전 결과와 비교)
+
+    python benchmarks/bench_stages.py --sizes 1K,64K,1M,16M --output before.json
+    python benchmarks/bench_stages.py --sizes 1K,64K,1M,16M --compare before.json
+
+단계: detect_input_type, extract_json_from_log, detect_product, deduplicate,
+      compress_and_mask, generate_ai_input, _emergency_compress
+각 단계는 앞 단계 결과를 입력으로 받아 따로 측정한다 (repeat 회 중 최솟값).
+1G 는 로그 문자열과 추출 결과를 메모리에 올리므로 수 GB 의 여유 메모리가 필요하다.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser  # noqa: E402
+from synth import make_json_export, make_sized_log, parse_size  # noqa: E402
+
+
+def _best(repeat, setup, fn):
+    """setup() 결과를 fn 에 넘겨 repeat 회 실행, (최소 시간, 마지막 반환값)"""
+    best = None
+    value = None
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        value = fn(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def _fresh(entries):
+    # 단계가 엔트리에 기록하는 값(product, keys 등)이 다음 반복에 남지 않도록 새 레코드
+    return [parser.PolicyEntry(e.source, e.line, e.context, e.data, e.product) for e in entries]
+
+
+def _detect_all(entries):
+    for entry in entries:
+        entry.product = parser.detect_product(entry)
+    return entries
+
+
+def bench_size(size, seed, repeat, budget):
+    """크기 하나에 대한 단계별 측정 결과 목록"""
+    log_text = make_sized_log(size, seed)
+    export = make_json_export(max(1, size // 2048), seed)
+    log_bytes = len(log_text.encode("utf-8"))
+    rows = []
+
+    def record(stage, input_name, seconds, n_bytes, items):
+        rows.append({
+            "stage": stage, "input": input_name, "size": size, "bytes": n_bytes,
+            "items": items, "seconds": seconds,
+            "mb_per_s": n_bytes / seconds / 1e6 if seconds and n_bytes else None,
+        })
+
+    for input_name, text in (("agent_log", log_text), ("json_export", export)):
+        seconds, input_type = _best(repeat, lambda: text, parser.detect_input_type)
+        record("detect_input_type", input_name, seconds, len(text.encode("utf-8")), 1)
+
+    seconds, (entries, signs, errors) = _best(repeat, lambda: log_text, parser.extract_json_from_log)
+    record("extract_json_from_log", "agent_log", seconds, log_bytes, len(entries))
+
+    # 언래핑은 판별 직전에 한 번만 (측정 대상 아님)
+    for entry in entries:
+        entry.data = parser.unwrap_policy(entry.data)
+
+    seconds, detected = _best(repeat, lambda: _fresh(entries), _detect_all)
+    record("detect_product", "agent_log", seconds, 0, len(detected))
+
+    seconds, unique = _best(repeat, lambda: _fresh(detected), parser.deduplicate)
+    record("deduplicate", "agent_log", seconds, 0, len(unique))
+
+    seconds, masked = _best(repeat, lambda: unique,
+                            lambda items: [parser.compress_and_mask(e.data) for e in items])
+    record("compress_and_mask", "agent_log", seconds, 0, len(masked))
+
+    compressed = []
+    for entry, data in zip(unique, masked):
+        compressed.append(parser.PolicyEntry(entry.source, entry.line, entry.context, data,
+                                             entry.product))
+    seconds, policies = _best(repeat, lambda: compressed,
+                              lambda items: parser.generate_ai_input(items, signs, errors))
+    record("generate_ai_input", "agent_log", seconds, 0, len(compressed))
+
+    seconds, text = _best(repeat, lambda: policies,
+                          lambda data: parser._emergency_compress(data, budget))
+    record("_emergency_compress", "agent_log", seconds, 0, len(text))
+    return rows
+
+
+def _row_key(row):
+    return (row["stage"], row["input"], row["size"])
+
+
+def compare(rows, baseline_path, threshold):
+    """이전 결과 대비 속도 비율 출력, threshold 보다 느려진 단계 수 반환"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {_row_key(r): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\n비교 기준: {baseline_path}")
+    for row in rows:
+        before = baseline.get(_row_key(row))
+        if not before or not before["seconds"]:
+            continue
+        ratio = row["seconds"] / before["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  ← 느려짐"
+            regressions += 1
+        print(f"  {row['stage']:<22} {row['input']:<12} {_fmt_size(row['size']):>6}  "
+              f"{before['seconds'] * 1e3:10.2f} → {row['seconds'] * 1e3:10.2f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def _fmt_size(size):
+    for unit, factor in (("G", 1024 ** 3), ("M", 1024 ** 2), ("K", 1024)):
+        if size >= factor:
+            return f"{size / factor:g}{unit}"
+    return str(size)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default="1K,64K,1M,16M", help="쉼표 구분 크기 (예: 1K,1M,1G)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--budget", type=int, default=parser.DEFAULT_CHAR_BUDGET,
+                    help="_emergency_compress 문자 예산")
+    ap.add_argument("--output", help="결과를 저장할 JSON 경로")
+    ap.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    ap.add_argument("--threshold", type=float, default=0.10, help="느려짐 판정 비율 (기본 10%%)")
+    args = ap.parse_args()
+
+    rows = []
+    for size in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+        size_rows = bench_size(size, args.seed, args.repeat, args.budget)
+        print(f"[{_fmt_size(size)}]")
+        for row in size_rows:
+            rate = f"{row['mb_per_s']:8.1f} MB/s" if row["mb_per_s"] else " " * 13
+            print(f"  {row['stage']:<22} {row['input']:<12} {row['seconds'] * 1e3:10.3f} ms  "
+                  f"{rate}  항목 {row['items']:,}")
+        rows.extend(size_rows)
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "parser_version": parser.PARSER_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "budget": args.budget,
+        },
+        "results": rows,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n저장: {args.output}")
+
+    if args.compare:
+        regressions = compare(rows, args.compare, args.threshold)
+        if regressions:
+            print(f"\n느려진 단계 {regressions}개")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
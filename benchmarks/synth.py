@@ -0,0 +1,219 @@
+"""
+synth.py — 벤치마크용 합성 에이전트 로그 / JSON 내보내기 생성기
+시드 고정으로 매 실행 동일한 데이터를 만든다.
+
+- 6개 제품 (SecureZone, RansomCruncher, nPouch, innoECM, LizardBackup, innoMark) 정책
+- 래퍼 형태: Policy={...} / {"id","time","policy":{...}} / 제품별 목록 래퍼 / 줄 중간 "policy":{...}
+- 손상 형태: 잘린 JSON, 후행 쓰레기
+- Sign Except / [itError] 줄, 일반 노이즈 줄
+"""
+
+import json
+import random
+
+
+_NOISE = [
+    "itSeczService::run, heartbeat ok",
+    "itFileWatcher::onChange, path=C:\\Users\\user\\Documents\\report{v2}.docx",
+    "itNetwork::send, server=10.0.0.12:8443, status=200",
+    "itProcMonitor::scan, count=128",
+    "itUpdater::check, version=11.0.3 latest",
+]
+
+_SIGNS = ["microsoft windows publisher", "ahnlab, inc.", "innotium,inc", "google llc"]
+
+PRODUCTS = ["SecureZone", "RansomCruncher", "nPouch", "innoECM", "LizardBackup", "innoMark"]
+
+# 제품별 로그 컨텍스트 (Policy= 앞부분)
+_CONTEXTS = {
+    "SecureZone": ["secureDrivePolicy", "accCtlAgentPolicyOff", "controlSuitePolicy"],
+    "RansomCruncher": ["rcDetectPolicy", "rcRdpPolicy"],
+    "nPouch": ["npouchPolicy", "npOriginProtectPolicy"],
+    "innoECM": ["ecmAgentPolicy", "ecmStoragePolicy"],
+    "LizardBackup": ["lbPolicy", "lbAgentPolicy"],
+    "innoMark": ["imPolicy", "imTemplatePolicy"],
+}
+
+# 목록형 래퍼를 쓰는 제품
+_LIST_WRAPPERS = {
+    "RansomCruncher": "resRansomCruncherDetectPolicy",
+    "nPouch": "resNpouchOriginProtectPolicy",
+}
+
+
+def _processes(rng, n):
+    return [
+        {"processName": f"app{rng.randrange(10000)}.exe",
+         "signs": rng.choice(["microsoft", "innotium,inc", ""]),
+         "sha2s": rng.choice(["", "ab" * 32]),
+         "isPassUncon": rng.random() < 0.1}
+        for _ in range(n)
+    ]
+
+
+def make_policy(rng, product, pid, list_size=5):
+    """제품별 정책 객체 하나 (목록형 필드는 list_size 항목 안팎)"""
+    n = max(0, int(rng.gauss(list_size, list_size / 3)))
+    if product == "SecureZone":
+        return {
+            "szAgentPolicyId": pid, "szAgentPolicyName": f"보안드라이브_{pid}",
+            "secureDriveLetter": "p", "isTakeoutDriveBlock": rng.random() < 0.5,
+            "isClipboardRestrict": rng.random() < 0.5, "usbControlAuth": rng.randrange(3),
+            "isCmd": True, "isRegedit": rng.random() < 0.5, "pickDenyDrive": "",
+            "cryptoKey": "MzyNo9mtlUq8pQnH", "manageFolder": "C:\\Users\\{user}\\Documents",
+            "exceptProcessList": _processes(rng, n),
+            "controlSuiteWebRestrictList": [
+                {"url": f"https://site{rng.randrange(1000)}.example.com", "type": rng.randrange(3)}
+                for _ in range(n)
+            ],
+        }
+    if product == "RansomCruncher":
+        return {
+            "rcDetectPolicyId": pid, "rcDetectPolicyName": f"랜섬_{pid}",
+            "protectExtension": "doc;docx;xls;xlsx;hwp;pdf",
+            "behaviorDetectLevelType": rng.randrange(3), "isRollbackUse": True,
+            "rollbackFileMaxSize": 100, "isBlockProcessIsolation": rng.random() < 0.5,
+            "resRansomCruncherDetectExceptList": _processes(rng, n),
+        }
+    if product == "nPouch":
+        return {
+            "npPolicyId": pid, "npPolicyName": f"반출_{pid}",
+            "isMaxReadCount": True, "maxReadCount": rng.randrange(1, 20),
+            "isMaxReadDay": False, "passwordMinDigit": 8,
+            "isScreenWaterMark": rng.random() < 0.5, "isSecondTakeout": False,
+            "resNpouchOriginProtectProcessList": _processes(rng, n),
+        }
+    if product == "innoECM":
+        return {
+            "agentPolicyId": pid, "agentPolicyName": f"문서중앙화_{pid}",
+            "driveMountType": 1, "privateFolderName": "내 문서함",
+            "storageQuota": 10240, "isUnlimitedStorageQuota": False,
+            "isUploadOverQuota": False, "uploadExtensionType": 1,
+            "uploadExtensionList": [{"extension": rng.choice(["exe", "zip", "msi", "bat"])}
+                                    for _ in range(n)],
+        }
+    if product == "LizardBackup":
+        return {
+            "lbPolicyId": pid, "lbPolicyName": f"백업_{pid}",
+            "sourceFolderPath": "C:\\Data", "targetFolderPath": "\\\\nas\\backup",
+            "isBackupRealtime": rng.random() < 0.5, "isBackupSchedule": True,
+            "storageProtocolType": 2, "storageAccountPassword": "pw!1234",
+            "isEncrypt": True, "isBackupVersion": True,
+        }
+    return {
+        "imPolicyId": pid, "imPolicyName": f"워터마크_{pid}",
+        "textLetter": "{대외비} 무단 반출 금지 {user}", "waterMarkOpacity": 30,
+        "isCapturePrevent": rng.random() < 0.5, "isProcessTrigger": True,
+        "imProcessTriggerList": [{"triggerValue": f"app{rng.randrange(100)}.exe"} for _ in range(n)],
+        "imUrlTriggerList": [{"triggerValue": f"site{rng.randrange(100)}.example.com"}
+                             for _ in range(n // 2)],
+    }
+
+
+def _policy_line(rng, i):
+    product = rng.choice(PRODUCTS)
+    pid = rng.randint(1, 50)
+    policy = make_policy(rng, product, pid)
+    context = rng.choice(_CONTEXTS[product])
+
+    form = rng.random()
+    if form < 0.15:
+        # 줄 중간에 박힌 "policy":{...} (Policy= 없음)
+        body = {"cmd": "update", "seq": i, "policy": policy}
+        return f"itPolicyRecv::onMessage, body={json.dumps(body, ensure_ascii=False)}"
+    if form < 0.45:
+        body = {"id": f"{pid};", "time": f"{1766398060 + i};", "policy": policy}
+    elif form < 0.6 and product in _LIST_WRAPPERS:
+        body = {_LIST_WRAPPERS[product]: [policy]}
+    else:
+        body = policy
+
+    text = json.dumps(body, ensure_ascii=False)
+    damage = rng.random()
+    if damage < 0.1:
+        text = text[:rng.randint(len(text) // 2, len(text) - 1)]  # 잘린 JSON
+    elif damage < 0.2:
+        text += rng.choice([" tail}", ", type=0 }}", " [itError]:{x}"])  # 후행 쓰레기
+    return f"{context}, Policy={text}"
+
+
+def _message(rng, i, policy_ratio):
+    r = rng.random()
+    if r < policy_ratio:
+        return _policy_line(rng, i)
+    if r < policy_ratio + 0.01:
+        return f"Sign Except Policy, sign={rng.choice(_SIGNS)}, type=0"
+    if r < policy_ratio + 0.02:
+        return f"[itError]:itProcFldRestrictPolicy::add, This process added aready. name=p{i}.exe"
+    return rng.choice(_NOISE)
+
+
+def _timestamp(i):
+    sec = i // 1000
+    return f"260107 {10 + sec // 3600 % 10:02d}:{sec // 60 % 60:02d}:{sec % 60:02d}:{i % 1000:03d}"
+
+
+def generate_agent_log(n_lines, seed=0, policy_ratio=0.02):
+    """n_lines 줄짜리 에이전트 로그 텍스트 줄을 하나씩 생성"""
+    rng = random.Random(seed)
+    for i in range(n_lines):
+        yield f"{_timestamp(i)} : {_message(rng, i, policy_ratio)}"
+
+
+def generate_sized_log(target_bytes, seed=0, policy_ratio=0.02):
+    """UTF-8 기준 약 target_bytes 크기가 될 때까지 로그 줄 생성 (1KB ~ 1GB)"""
+    rng = random.Random(seed)
+    written = 0
+    i = 0
+    while written < target_bytes:
+        line = f"{_timestamp(i)} : {_message(rng, i, policy_ratio)}"
+        written += len(line.encode("utf-8")) + 1
+        i += 1
+        yield line
+
+
+def make_agent_log(n_lines, seed=0, policy_ratio=0.02):
+    """합성 로그 전체를 하나의 문자열로 반환"""
+    return "\n".join(generate_agent_log(n_lines, seed, policy_ratio))
+
+
+def make_sized_log(target_bytes, seed=0, policy_ratio=0.02):
+    """약 target_bytes 크기의 합성 로그 문자열"""
+    return "\n".join(generate_sized_log(target_bytes, seed, policy_ratio))
+
+
+def write_agent_log(path, target_bytes, seed=0, policy_ratio=0.02):
+    """약 target_bytes 크기의 합성 로그를 파일로 기록 (메모리에 올리지 않음), 기록한 바이트 수 반환"""
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for line in generate_sized_log(target_bytes, seed, policy_ratio):
+            f.write(line)
+            f.write("\n")
+    with open(path, "rb") as f:
+        return f.seek(0, 2)
+
+
+def make_json_export(n_policies, seed=0, form="array", list_size=5):
+    """
+    관리 콘솔 JSON 내보내기 형태
+    form: "array" (clean_json_array) / "concat" (multi_json, 줄바꿈으로 이어붙임)
+    """
+    rng = random.Random(seed)
+    policies = []
+    for i in range(n_policies):
+        product = PRODUCTS[i % len(PRODUCTS)]
+        policy = make_policy(rng, product, i + 1, list_size)
+        if rng.random() < 0.3:
+            policy = {"id": f"{i + 1};", "time": f"{1766398060 + i};", "policy": policy}
+        policies.append(policy)
+    if form == "concat":
+        return "\n".join(json.dumps(p, ensure_ascii=False) for p in policies)
+    return json.dumps(policies, ensure_ascii=False, indent=2)
+
+
+def parse_size(text):
+    """'1K', '64K', '16M', '1G' 같은 크기 표기 → 바이트 수"""
+    text = text.strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
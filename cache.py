@@ -0,0 +1,206 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  cache.py — 2단 캐시 (메모리 LRU + SQLite 공유 캐시)           ║
+║  파싱 결과 / AI 응답 재사용                                    ║
+╚══════════════════════════════════════════════════════════════╝
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import codec
+
+
+def content_key(*parts):
+    """입력 내용 기반 캐시 키 (blake2b 128bit)"""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8", errors="surrogatepass")
+        h.update(part)
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+# ═══════════════════════════════════════════════════
+# 1단: 프로세스 내 메모리 LRU
+# ═══════════════════════════════════════════════════
+class LRUCache:
+    """스레드 안전한 크기 제한 LRU — 값은 공유되므로 읽기 전용으로 다룰 것, ttl(초) 지정 시 만료"""
+
+    def __init__(self, max_entries=128, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()  # 키 → (값, 저장 시각)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, stored = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if self.ttl is not None and time.monotonic() - stored > self.ttl:
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# ═══════════════════════════════════════════════════
+# 2단: SQLite 파일 캐시 (여러 워커 프로세스가 공유)
+# ═══════════════════════════════════════════════════
+class SQLiteCache:
+    """JSON 직렬화 값을 저장하는 SQLite 캐시 — ttl(초) 지정 시 만료, 최대 개수 초과 시 오래된 것부터 삭제"""
+
+    def __init__(self, path, table="cache", max_entries=10000, ttl=None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed)")
+
+    def _connect(self):
+        # 연산마다 새 연결 — 스레드/프로세스 간 공유 문제 없음
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._count("evictions")
+                row = None
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return codec.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        payload = codec.dumps(value)
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+                self._count("evictions", overflow)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def _count(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def stats(self):
+        with self._connect() as conn:
+            entries = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TieredCache:
+    """메모리 LRU → SQLite 순서로 조회, 디스크 적중은 메모리로 승격"""
+
+    def __init__(self, memory, disk=None, encode=None, decode=None):
+        self.memory = memory
+        self.disk = disk
+        # 디스크 저장용 변환 (값 ↔ JSON 호환 객체)
+        self._encode = encode or (lambda value: value)
+        self._decode = decode or (lambda stored: stored)
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        stored = self.disk.get(key)
+        if stored is None:
+            return None
+        value = self._decode(stored)
+        self.memory.put(key, value)
+        return value
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, self._encode(value))
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
@@ -0,0 +1,64 @@
+"""
+╔══════════════════════════════════════════════════════════════╗
+║  codec.py — JSON 코덱 (orjson 설치 시 사용, 없으면 표준 json)   ║
+║  출력은 항상 ensure_ascii=False (한글 그대로)                  ║
+╚══════════════════════════════════════════════════════════════╝
+
+JSON_CODEC=json 환경변수로 표준 json 강제 (문제 추적/비교용).
+orjson 이 거부하는 입력·값(NaN, 64비트 초과 정수, 서로게이트 문자, 문자열 아닌 키 등)은
+표준 json 으로 다시 처리한다. 출력 차이는 실수 표기(1e+16 → 1e16)와 NaN/Infinity(→ null) 뿐.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKEND = "json"
+fast_loads = None  # 완결된 JSON 한 덩어리 전용 빠른 디코더 (없으면 None) — 실패 시 ValueError
+
+
+def set_backend(name):
+    """"orjson" / "json" / "auto" — orjson 이 없으면 항상 json"""
+    global BACKEND, fast_loads
+    if name in ("auto", "orjson") and orjson is not None:
+        BACKEND = "orjson"
+        fast_loads = orjson.loads
+    else:
+        BACKEND = "json"
+        fast_loads = None
+    return BACKEND
+
+
+set_backend(os.getenv("JSON_CODEC", "auto"))
+
+
+def loads(text):
+    """JSON 텍스트(str/bytes) → 객체 (표준 json 과 같은 결과, 실패 시 json.JSONDecodeError)"""
+    if fast_loads is not None:
+        try:
+            return fast_loads(text)
+        except ValueError:
+            pass  # 표준 json 확장 문법 또는 잘못된 입력 — 아래에서 판정
+    return json.loads(text)
+
+
+def dumps(value, pretty=False, sort_keys=False, default=None):
+    """
+    객체 → JSON 문자열 (ensure_ascii=False)
+    pretty: indent=2 (json.dumps(indent=2) 와 같은 형태), 아니면 공백 없는 compact
+    """
+    if BACKEND == "orjson":
+        option = (orjson.OPT_INDENT_2 if pretty else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(value, default=default, option=option).decode("utf-8")
+        except TypeError:
+            pass  # orjson.JSONEncodeError 포함 — 표준 json 으로 재시도
+    if pretty:
+        return json.dumps(value, ensure_ascii=False, indent=2, sort_keys=sort_keys, default=default)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"),
+                      sort_keys=sort_keys, default=default)
@@ -4,11 +4,32 @@
 ║  더러운 에이전트 로그 → 깨끗한 정책 JSON 추출                   ║
 ║  6개 제품 자동 판별 + 중복 제거 + 목록 압축                     ║
 ╚══════════════════════════════════════════════════════════════╝
+
+일괄 처리: python parser.py logs/ 'fleet/**/*.log' -o results.ndjson -j 8
+          (--format policies 면 정책마다 한 줄)
 """
 
+import argparse
+import bz2
+import fnmatch
+import glob
+import gzip
+import io
+import os
 import re
+import shutil
+import sys
 import json
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from collections import defaultdict
+from functools import lru_cache
+from itertools import chain, islice
+from time import perf_counter
+
+import codec
+from cache import LRUCache, SQLiteCache, TieredCache, content_key
 
 
 # ═══════════════════════════════════════════════════
@@ -123,98 +144,293 @@ SENSITIVE_FIELDS = [
     "cryptoKey", "password"
 ]
 
+# AI 입력 예산 (대략 1글자 = 1토큰 기준, 문자 수)
+DEFAULT_CHAR_BUDGET = 30000
+FEATURE_CHAR_BUDGETS = {
+    "translate": 30000,
+    "simulate": 30000,
+    "diagnose": 30000,
+}
+MODEL_CHAR_BUDGETS = {
+    "gemini-2.5-flash": 200000,
+    "gemini-2.5-pro": 200000,
+}
+
+# 예산 초과 시 필드 우선순위 — KB 보안 등급 기준 (🔴 끝까지 유지, 🟡 먼저 제거)
+# 목록에 없는 필드는 중간 우선순위, ID/이름 필드는 항상 유지
+COMMON_LOW_PRIORITY_FIELDS = {
+    "createDatetime", "updateDatetime", "createUserName", "updateUserName",
+    "assignPolicyType", "_wrapper_id", "_wrapper_time"
+}
+FIELD_PRIORITIES = {
+    "SecureZone": {
+        "high": {
+            "secureDriveTemplateId", "controlSuiteId", "isTakeoutDriveBlock",
+            "isAllowDenyProcessUse", "isAllowDenyProcess", "isBlockExecuteProcess",
+            "isClipboardRestrict", "isNetwork", "controlSuiteProcessList",
+            "controlSuiteProcessTagList", "isAccessControl", "isCmd", "isRegedit",
+            "pickDenyDrive", "usbControlAuth"
+        },
+        "low": {
+            "isExceptProcess", "isSyncFolder", "isWatchFileExtention", "isWatchFileHeader",
+            "isShowAgentShutdownMenu", "isShowEmergencyCodeMenu", "isLogin",
+            "isSignExcept", "signExcept", "isHideExplorerRecent", "pickExceptDrive"
+        },
+    },
+    "RansomCruncher": {
+        "high": {
+            "protectExtension", "behaviorDetectLevelType", "isSoftwareCertificate",
+            "isMssqlRemoteBlock", "isRollbackUse", "isBlockProcessIsolation",
+            "exceptDetectPeriod", "isConnect", "isAlwaysConnect"
+        },
+        "low": {"isHideTrayIcon", "accessLimitIdleMinute"},
+    },
+    "nPouch": {
+        "high": {
+            "isMaxReadCount", "maxReadCount", "isMaxReadDay", "maxReadDay",
+            "isOriginProtectPolicy", "csuId", "driveLetter", "isAllowProcess",
+            "isExceptProcess", "isBlockProcess", "isScreenWaterMark",
+            "isPrintWaterMark", "isSecondTakeout"
+        },
+        "low": {"npPackageFileCreateType"},
+    },
+    "innoECM": {
+        "high": {"isUploadOverQuota"},
+        "low": {
+            "driveMountType", "privateFolderName", "groupFolderName", "backupFolderName",
+            "sharedFolderName", "isBackupFolderHide", "agentPolicyAssignGroupCount",
+            "agentPolicyAssignUserCount", "isUnlimitedStorageQuota",
+            "isAgentFolderFileRename", "isGroupFileSizeQuota",
+            "specialIpAddressConnectType", "isDefault"
+        },
+    },
+    "LizardBackup": {
+        "high": {
+            "sourceFolderPath", "targetFolderPath", "isTargetProtect",
+            "isBackupRealtime", "isBackupSchedule", "isDeleteAfterBackup",
+            "isDeleteWithoutBackup", "isEncrypt", "isRecovery",
+            "storageProtocolType", "storageAccount", "storageAccountPassword"
+        },
+        "low": {
+            "isSourceIncludeExtension", "sourceBackupExtension", "isHideSystemFileExcept",
+            "isNoneExtensionFileExcept", "lizardBackupConvenience", "lizardBackupAdvance",
+            "isDriveConnectBackup", "isIdleBackup", "idleCpuUsage", "idleInputTime",
+            "isShutdownAfterBackup", "isBackupOnShutdown", "isBackupOnStartup",
+            "extensionFilterType", "extensionList", "includePattern",
+            "excludeFolderPattern", "realtimeExcludePattern", "realtimeDelayPattern",
+            "singleFileMaxSize", "isOverCapacityWarning", "isLocalStorageWarning",
+            "isCompressBackup", "hardDeleteCount", "isOnlyHardDelete", "isBackupManage",
+            "isRecoveryClean", "isRecoveryDelete", "isWithoutPasswordBackupWindow",
+            "isWithoutPasswordRecoveryWindow", "isPcTimeByServer", "isTray",
+            "lbTrayClickActionType", "policyRenewMinute", "logRenewMinute",
+            "isUserScheduleAllow", "isUserVersionAllow", "isShowRecentBackup",
+            "isShowBackupMenu", "isShowBackupStop", "isAdminKeyAllow",
+            "storageAccountType", "isPassiveMode", "isUtf8", "storagePath"
+        },
+    },
+    "innoMark": {
+        "high": {
+            "isWatermarkTrigger", "isCapture", "isCapturePrevent",
+            "isAlwaysUseCapturePrevent", "isInvisibleWatermark", "isExecuteBlockProcess",
+            "isConnect", "isAlwaysConnect", "rdpClipboardUseType", "isBlockFileCopy"
+        },
+        "low": {
+            "isRegistTrigger", "isWorkingTimeTrigger", "targetWatermarkDisplayType",
+            "targetWatermarkPriorityType", "dynamicOpacityAwaySeconds",
+            "dynamicOpacityIncrease", "watermarkLocationMoveSeconds",
+            "watermarkLocationMoveWidth", "watermarkLocationMoveHeight",
+            "textSize", "textSizeType", "textColor", "textDegree",
+            "splitScreenLocationType", "isTextLetterQrcode", "isTextOutline",
+            "isBeforeShutdownText", "beforeShutdownTextMinute"
+        },
+    },
+}
+
 
 # ═══════════════════════════════════════════════════
 # 핵심 함수: 입력 타입 자동 감지
 # ═══════════════════════════════════════════════════
 def detect_input_type(raw_input):
     """입력이 깨끗한 JSON인지 더러운 로그인지 자동 판별"""
+    return classify_input(raw_input)[0]
+
+
+def classify_input(raw_input):
+    """
+    입력 타입 판별 + 판별 중 디코딩한 객체를 함께 반환 (재파싱 방지)
+    Returns: (input_type, decoded)
+        clean_json 계열: 디코딩된 객체
+        multi_json: (offset, obj | None) 이터레이터 (판별에 쓴 앞부분 포함), 그 외 None
+    """
     text = raw_input.strip()
+    pieces = None
 
     # Case 1: 깨끗한 JSON 객체 (단일)
     if text.startswith('{') and text.endswith('}'):
         try:
-            json.loads(text)
-            return "clean_json"
+            return "clean_json", codec.loads(text)
         except json.JSONDecodeError:
             # 여러 JSON이 붙어있을 수 있음 {...}{...} 또는 {...}\n{...}
-            if _count_top_level_jsons(text) > 1:
-                return "multi_json"
+            pieces = _peek_json_objects(text)
+            if pieces is not None:
+                return "multi_json", pieces
 
     # Case 2: 깨끗한 JSON 배열
     if text.startswith('[') and text.endswith(']'):
         try:
-            json.loads(text)
-            return "clean_json_array"
+            return "clean_json_array", codec.loads(text)
         except json.JSONDecodeError:
             pass
 
     # Case 2.5: 구분자로 나뉜 복수 JSON  ─────  또는 ===== 등
     if re.search(r'\}\s*[\n─=\-]{2,}\s*\{', text):
-        return "multi_json"
+        return "multi_json", None
 
-    # Case 2.6: 줄바꿈으로 나뉜 복수 JSON
-    if re.search(r'\}\s*\n\s*\{', text):
-        if _count_top_level_jsons(text) > 1:
-            return "multi_json"
+    # Case 2.6: 줄바꿈으로 나뉜 복수 JSON (Case 1에서 이미 세어봤으면 생략)
+    if pieces is None and re.search(r'\}\s*\n\s*\{', text):
+        pieces = _peek_json_objects(text)
+        if pieces is not None:
+            return "multi_json", pieces
 
     # Case 3: 로그 (타임스탬프 패턴 존재)
     if re.search(r'\d{6}\s+\d{2}:\d{2}:\d{2}', text):
-        return "agent_log"
+        return "agent_log", None
 
     # Case 4: Policy= 패턴이 있는 로그
     if 'Policy=' in text or 'policy=' in text:
-        return "policy_log"
+        return "policy_log", None
 
     # Case 5: JSON이 텍스트 사이에 섞여있음
     if re.search(r'\{[^{}]*"[a-zA-Z]+"[^{}]*:', text):
-        return "mixed_content"
+        return "mixed_content", None
+
+    return "unknown", None
 
-    return "unknown"
+
+def _peek_json_objects(text):
+    """최상위 JSON이 2개 이상이면 분리 이터레이터 반환 (앞 2개만 미리 디코딩), 아니면 None"""
+    splitter = _split_json_objects(text)
+    head = list(islice(splitter, 2))
+    if len(head) < 2:
+        return None
+    return chain(head, splitter)
 
 
 def _count_top_level_jsons(text):
     """최상위 레벨 JSON 객체 수를 센다"""
-    count = 0
-    depth = 0
-    for ch in text:
-        if ch == '{':
-            if depth == 0:
-                count += 1
-            depth += 1
-        elif ch == '}':
-            depth -= 1
-    return count
+    return sum(1 for _ in _split_json_objects(text))
 
 
 def extract_multiple_jsons(text):
     """연속된 여러 JSON 객체를 분리 추출"""
-    jsons = []
-    text = text.strip()
+    return [obj for _, obj in iter_json_objects(text)]
+
+
+def iter_json_objects(text):
+    """
+    연결된 JSON 객체 분리기 — (offset, obj) 를 하나씩 생성
+    {...}{...}, 줄바꿈, ─── / === 구분선, 사이의 잡문자 모두 건너뛴다
+    """
+    for offset, obj in _split_json_objects(text):
+        if obj is not None:
+            yield offset, obj
 
-    # 구분자 제거 (─── , ===, --- 등)
-    text = re.sub(r'[\n\r]\s*[─=\-]{2,}\s*[\n\r]', '\n', text)
 
-    # 중괄호 균형으로 분리
+_BRACE_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"?|[{}]')
+
+
+def _split_json_objects(text):
+    """최상위 {...} 구간마다 (offset, obj | None) 생성 — 디코딩 실패 구간은 None"""
+    pos = text.find('{')
+    while pos >= 0:
+        try:
+            obj, end = _DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            obj, end = None, _skip_balanced(text, pos)
+        yield pos, obj
+        pos = text.find('{', end)
+
+
+def _skip_balanced(text, pos):
+    """pos의 '{' 와 짝이 맞는 '}' 다음 위치 (문자열 안 괄호는 무시)"""
     depth = 0
-    start = None
-    for i, ch in enumerate(text):
-        if ch == '{':
-            if depth == 0:
-                start = i
+    for m in _BRACE_TOKEN_RE.finditer(text, pos):
+        tok = m.group()
+        if tok == '{':
             depth += 1
-        elif ch == '}':
+        elif tok == '}':
             depth -= 1
-            if depth == 0 and start is not None:
-                json_str = text[start:i+1]
-                try:
-                    parsed = json.loads(json_str)
-                    jsons.append(parsed)
-                except json.JSONDecodeError:
-                    pass
-                start = None
+            if depth == 0:
+                return m.end()
+    return len(text)
 
-    return jsons
+
+# ═══════════════════════════════════════════════════
+# 추출된 정책 레코드
+# ═══════════════════════════════════════════════════
+# 예전 dict 키 → 속성 (entry["_data"] 형태 읽기 호환용)
+_ENTRY_FIELDS = {
+    "_source": "source", "_line": "line", "_context": "context", "_data": "data",
+    "_product": "product", "_keys": "keys", "_fingerprint": "fingerprint",
+}
+
+
+class PolicyEntry:
+    """
+    추출된 정책 하나. 큰 로그에서는 중복 제거 전 수십만 개가 만들어지므로 dict 대신 __slots__,
+    source/product 문자열은 intern 해서 엔트리 간에 공유한다 (프로세스 간 전송 후 포함).
+    로그 줄의 context 는 타임스탬프를 포함해 줄마다 달라 intern 하지 않는다 (고정 context 는 리터럴 공유).
+    keys: 판별 단계에서 수집한 키 색인 캐시, fingerprint: 내용 지문 (collapse_identical)
+    """
+    __slots__ = ("source", "line", "context", "data", "product", "keys", "fingerprint")
+
+    def __init__(self, source, line, context, data, product=None):
+        self.source = sys.intern(source)
+        self.line = line
+        self.context = context
+        self.data = data
+        self.product = sys.intern(product) if product is not None else None
+        self.keys = None
+        self.fingerprint = None
+
+    def __reduce__(self):
+        # 키 색인/지문은 보내지 않음 — 받는 쪽에서 다시 intern
+        return PolicyEntry, (self.source, self.line, self.context, self.data, self.product)
+
+    def __repr__(self):
+        return f"PolicyEntry({self.source!r}, {self.line!r}, {self.context!r}, product={self.product!r})"
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, _ENTRY_FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        value = getattr(self, _ENTRY_FIELDS[key]) if key in _ENTRY_FIELDS else None
+        return default if value is None else value
+
+    def copy(self):
+        entry = PolicyEntry(self.source, self.line, self.context, self.data, self.product)
+        entry.keys = self.keys
+        entry.fingerprint = self.fingerprint
+        return entry
+
+    def to_dict(self):
+        """예전 형태의 dict ({"_source", "_line", "_context", "_data", "_product"})"""
+        result = {"_source": self.source, "_line": self.line,
+                  "_context": self.context, "_data": self.data}
+        if self.product is not None:
+            result["_product"] = self.product
+        return result
+
+
+def _as_entry(entry):
+    """공개 함수에 예전 dict 형태 엔트리가 들어와도 처리"""
+    if isinstance(entry, PolicyEntry):
+        return entry
+    return PolicyEntry(entry.get("_source", ""), entry.get("_line", 0), entry.get("_context", ""),
+                       entry.get("_data", {}), entry.get("_product"))
 
 
 # ═══════════════════════════════════════════════════
@@ -226,137 +442,545 @@ def extract_json_from_log(raw_text):
     errors = []
     sign_policies = []
 
-    lines = raw_text.split('\n')
+    for kind, item in _scan_lines(_iter_text_lines(raw_text)):
+        if kind == "entry":
+            extracted.append(item)
+        elif kind == "sign":
+            sign_policies.append(item)
+        else:
+            errors.append(item)
+
+    return extracted, sign_policies, errors
+
+
+def iter_log_events(source, encoding="utf-8", max_line=None):
+    """
+    스트리밍 추출: 파일 경로 또는 바이너리 파일 객체를 한 줄씩 읽으며
+    ("entry" | "sign" | "error", 항목) 튜플을 생성한다.
+    로그 전체를 메모리에 올리지 않는다. max_line: iter_log_lines 참고
+    """
+    return _scan_lines(iter_log_lines(source, encoding, max_line))
+
+
+def iter_log_lines(source, encoding="utf-8", max_line=None):
+    """
+    파일 경로 / 바이너리 파일 객체에서 (줄번호, 줄) 생성 — 경로는 gzip/bz2/zip 이면 풀면서 읽는다
+    max_line: 한 줄 최대 바이트 (줄바꿈 포함) — 넘는 줄을 만나면 InputTooLarge (줄바꿈 없는 거대한 입력 방지)
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        raw_file = open(source, "rb")
+        f = open_log_stream(raw_file)
+        should_close = True
+    else:
+        f = source
+        should_close = False
+    try:
+        lines = f if max_line is None else _bounded_lines(f, max_line)
+        for line_num, raw in enumerate(lines, 1):
+            if isinstance(raw, bytes):
+                raw = raw.decode(encoding, errors="replace")
+            yield line_num, raw
+    finally:
+        if should_close:
+            f.close()
+            raw_file.close()
+
+
+def _bounded_lines(f, max_line):
+    """readline(max_line + 1) 로 한 줄씩 — 줄 하나를 끝까지 읽기 전에 길이 초과를 알아챈다"""
+    while True:
+        line = f.readline(max_line + 1)
+        if not line:
+            return
+        if len(line) > max_line:
+            raise InputTooLarge(f"로그 한 줄이 {max_line:,}바이트를 넘습니다")
+        yield line
+
+
+# ═══════════════════════════════════════════════════
+# 압축 로그 입력 — gzip / bz2 / zip 을 스트림으로 풀기 (전체를 메모리에 올리지 않음)
+# ═══════════════════════════════════════════════════
+_COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"PK\x03\x04", "zip"),
+)
+
+
+def _compression(head):
+    for magic, kind in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def is_compressed_file(path):
+    """매직 바이트 기준 gzip / bz2 / zip 파일 여부"""
+    with open(path, "rb") as f:
+        return _compression(f.read(4)) is not None
+
+
+class InputTooLarge(ValueError):
+    """(압축을 푼) 업로드 입력이 크기 상한을 넘음 — 압축 폭탄 방지"""
+
+
+class _LimitedReader(io.RawIOBase):
+    """읽은 바이트 수를 세다가 max_bytes 를 넘으면 InputTooLarge"""
+
+    def __init__(self, stream, max_bytes):
+        self._stream = stream
+        self._remaining = max_bytes
+        self._max_bytes = max_bytes
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        # 상한보다 1바이트 더 읽어 보고 넘으면 중단 (정확히 상한 크기인 입력은 통과)
+        data = self._stream.read(min(len(buffer), self._remaining + 1))
+        self._remaining -= len(data)
+        if self._remaining < 0:
+            raise InputTooLarge(f"압축을 푼 입력이 {self._max_bytes:,}바이트를 넘습니다")
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def read_json_bytes(stream, limit, chunk_size=64 * 1024):
+    """JSON 문서 스트림을 끝까지 읽기 — 조각 단위로 읽으면서 limit 바이트를 넘으면 InputTooLarge"""
+    data = bytearray()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return data
+        data += chunk
+        if len(data) > limit:
+            raise InputTooLarge(f"압축을 푼 JSON 문서가 {limit:,}바이트를 넘습니다")
+
+
+class _ChainedReader(io.RawIOBase):
+    """여러 바이너리 스트림을 하나로 이어 읽기 (매직 바이트 확인용으로 읽은 앞부분 되돌리기 / zip 멤버 연결)"""
+
+    def __init__(self, streams):
+        self._streams = iter(streams)
+        self._current = next(self._streams, None)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        filled = 0
+        while self._current is not None and filled < len(buffer):
+            data = self._current.read(len(buffer) - filled)
+            if not data:
+                self._current = next(self._streams, None)
+                continue
+            buffer[filled:filled + len(data)] = data
+            filled += len(data)
+        return filled
+
+
+def _zip_members(fileobj):
+    """zip 안의 파일 멤버를 이름순으로 하나씩 열어서 yield (다 읽으면 닫힌다)"""
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in sorted(archive.infolist(), key=lambda i: i.filename):
+            if info.is_dir():
+                continue
+            with archive.open(info) as member:
+                yield member
+
+
+def _seek_position(fileobj):
+    """되돌아갈 수 있는 스트림이면 현재 위치, 아니면 None (요청 본문 스트림 등)"""
+    try:
+        return fileobj.tell() if fileobj.seekable() else None
+    except (AttributeError, OSError):
+        return None
+
+
+def open_log_stream(fileobj, max_bytes=None):
+    """
+    바이너리 파일 객체 → 압축(매직 바이트)을 풀면서 읽는 바이너리 스트림 (줄 단위 순회 가능).
+    gzip / bz2 는 순차 해제, zip 은 멤버를 이름순으로 이어 읽는다 (seek 불가 입력은 압축 상태로
+    임시 파일에 옮긴 뒤 연다). 압축이 아니면 그대로 읽는다. 원래 fileobj 는 닫지 않는다.
+    max_bytes: 풀린 내용의 최대 바이트 — 넘게 읽으려 하면 InputTooLarge
+    """
+    stream = _open_log_stream(fileobj)
+    if max_bytes is None:
+        return stream
+    return io.BufferedReader(_LimitedReader(stream, max_bytes))
+
+
+def _open_log_stream(fileobj):
+    start = _seek_position(fileobj)
+    head = fileobj.read(4)
+    kind = _compression(head)
+    if kind == "zip":
+        if start is not None:
+            fileobj.seek(start)
+            archive = fileobj
+        else:
+            archive = tempfile.TemporaryFile()
+            archive.write(head)
+            shutil.copyfileobj(fileobj, archive)
+            archive.seek(0)
+        return io.BufferedReader(_ChainedReader(_zip_members(archive)))
+
+    stream = io.BufferedReader(_ChainedReader((io.BytesIO(head), fileobj)))
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=stream)
+    if kind == "bz2":
+        return bz2.BZ2File(stream)
+    return stream
+
 
-    for line_num, line in enumerate(lines, 1):
+def _splittable(source):
+    """병렬 구간 분할 가능 여부 — 압축되지 않은 파일 경로만"""
+    return isinstance(source, (str, bytes, os.PathLike)) and not is_compressed_file(source)
+
+
+_LINE_CHUNK_CHARS = 1 << 20  # 한 번에 split 할 글자 수 (줄 경계에서 자름)
+
+
+def _iter_text_lines(raw_text):
+    """
+    문자열 입력을 (줄번호, 줄) 로 순회 — 약 1M 글자 구간씩 split.
+    io.StringIO 는 입력 전체를 UCS-4 버퍼로 복사하므로 큰 로그에서 피크 메모리가 수 배가 된다.
+    """
+    line_num = 1
+    start = 0
+    size = len(raw_text)
+    while start < size:
+        end = start + _LINE_CHUNK_CHARS
+        if end >= size:
+            end = size
+        else:
+            cut = raw_text.rfind("\n", start, end)
+            end = cut if cut >= 0 else raw_text.find("\n", end)  # 구간보다 긴 줄
+            if end < 0:
+                end = size
+        lines = raw_text[start:end].split("\n")
+        if end == size and raw_text.endswith("\n"):
+            lines.pop()  # io.StringIO 처럼 마지막 줄바꿈 뒤에는 줄이 없음 (병렬 구간 줄 수 보정에 필요)
+        for line in lines:
+            yield line_num, line
+            line_num += 1
+        start = end + 1
+
+
+# 라인 스캐너용 사전 컴파일 패턴 — 부분문자열 사전필터를 통과한 줄에만 실행
+_POLICY_RE = re.compile(r'Policy=(\{.+)')
+_INNER_POLICY_RE = re.compile(r'"policy"\s*:\s*(?=\{)')
+_SIGN_RE = re.compile(r'Sign Except Policy,\s*sign=(.+?),\s*type=(\d+)')
+_ITERROR_RE = re.compile(r'\[itError\]:(.+)')
+
+
+def _scan_lines(numbered_lines):
+    """(줄번호, 줄) 스트림에서 정책/서명예외/에러 이벤트 생성"""
+    for line_num, line in numbered_lines:
         line = line.strip()
         if not line:
             continue
 
         # ── 패턴 1: Policy={...} 형태 ──
-        policy_matches = re.finditer(r'Policy=(\{.+)', line)
-        for match in policy_matches:
-            json_str = match.group(1)
-            parsed = _safe_parse_json(json_str)
-            if parsed:
-                # 로그 컨텍스트 (어떤 정책인지 힌트)
-                context = line[:line.find('Policy=')].strip().rstrip(',')
-                extracted.append({
-                    "_source": "log",
-                    "_line": line_num,
-                    "_context": context,
-                    "_data": parsed
-                })
+        if 'Policy={' in line:
+            # .+ 가 줄 끝까지 먹으므로 한 줄에 매칭은 최대 1개
+            match = _POLICY_RE.search(line)
+            if match:
+                parsed = _safe_parse_json(match.group(1))
+                if parsed:
+                    # 로그 컨텍스트 (어떤 정책인지 힌트)
+                    context = line[:line.find('Policy=')].strip().rstrip(',')
+                    yield "entry", PolicyEntry("log", line_num, context, parsed)
 
         # ── 패턴 2: "policy":{...} 가 포함된 라인 (래퍼 안) ──
         if '"policy"' in line and 'Policy=' not in line:
-            inner_matches = re.finditer(r'"policy"\s*:\s*(\{.+?\})\s*[,}]', line)
-            for match in inner_matches:
-                parsed = _safe_parse_json(match.group(1))
+            resume = 0
+            for match in _INNER_POLICY_RE.finditer(line):
+                if match.start() < resume:
+                    continue  # 이미 디코딩한 객체 내부의 "policy" 키
+                # 비탐욕 정규식 대신 '{' 부터 디코딩 — 중첩 객체도 끝을 정확히 찾음
+                parsed, end, _ = recover_json(line[match.end():])
+                resume = match.end() + end
                 if parsed:
-                    extracted.append({
-                        "_source": "log_inner",
-                        "_line": line_num,
-                        "_context": "embedded_policy",
-                        "_data": parsed
-                    })
+                    yield "entry", PolicyEntry("log_inner", line_num, "embedded_policy", parsed)
 
         # ── 패턴 3: 독립 JSON 객체 (줄 전체가 JSON) ──
         if line.startswith('{'):
             parsed = _safe_parse_json(line)
             if parsed:
-                extracted.append({
-                    "_source": "standalone",
-                    "_line": line_num,
-                    "_context": "",
-                    "_data": parsed
-                })
+                yield "entry", PolicyEntry("standalone", line_num, "", parsed)
 
         # ── 패턴 4: Sign Except Policy 라인 ──
-        sign_match = re.match(
-            r'.*Sign Except Policy,\s*sign=(.+?),\s*type=(\d+)',
-            line
-        )
-        if sign_match:
-            sign_policies.append({
-                "sign": sign_match.group(1).strip(),
-                "type": int(sign_match.group(2))
-            })
+        if 'Sign Except Policy,' in line:
+            sign_match = _match_last(_SIGN_RE, line, 'Sign Except Policy,')
+            if sign_match:
+                yield "sign", {
+                    "sign": sign_match.group(1).strip(),
+                    "type": int(sign_match.group(2))
+                }
 
         # ── 패턴 5: [itError] 에러 메시지 ──
-        error_match = re.match(r'.*\[itError\]:(.+)', line)
-        if error_match:
-            errors.append({
-                "_line": line_num,
-                "_message": error_match.group(1).strip()
-            })
+        if '[itError]:' in line:
+            error_match = _match_last(_ITERROR_RE, line, '[itError]:')
+            if error_match:
+                yield "error", {
+                    "_line": line_num,
+                    "_message": error_match.group(1).strip()
+                }
 
-    return extracted, sign_policies, errors
+
+def _match_last(pattern, line, marker):
+    """
+    선행 '.*' 없는 앵커 매칭 — marker의 마지막 위치부터 거꾸로 시도.
+    re.match(r'.*' + pattern) 의 탐욕적 매칭과 같은 결과를 백트래킹 없이 얻는다.
+    """
+    idx = line.rfind(marker)
+    while idx >= 0:
+        match = pattern.match(line, idx)
+        if match:
+            return match
+        idx = line.rfind(marker, 0, idx)
+    return None
 
 
 def _safe_parse_json(json_str):
     """JSON 파싱 시도 — 깨진 JSON도 최대한 복구"""
-    # 시도 1: 그대로 파싱
+    if codec.fast_loads is not None:
+        # 완결된 JSON 이 대부분 — 빠른 디코더로 먼저, 후행 쓰레기/잘림/확장 문법은 복구 엔진으로
+        try:
+            return codec.fast_loads(json_str)
+        except ValueError:
+            pass
+    return recover_json(json_str)[0]
+
+
+_DECODER = json.JSONDecoder()
+
+# 복구 스캐너 토큰: 문자열(닫히지 않은 것 포함) / 구조 문자 / 스칼라 덩어리
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"?|[{}\[\],:]|[^\s{}\[\],:"]+')
+_JSON_SCALAR_RE = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null')
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def recover_json(json_str):
+    """
+    JSON 복구 엔진 — raw_decode 1회로 객체 끝을 찾고, 실패 시 잘린 꼬리를 보정.
+
+    Returns:
+        (obj | None, end, repaired)
+        end: 디코딩이 멈춘 위치 (json_str 문자 인덱스, 이후는 버려진 꼬리)
+        repaired: 잘린 JSON을 닫아서 복구했으면 True
+    """
     try:
-        return json.loads(json_str)
+        # 완결된 객체 + 후행 쓰레기는 여기서 끝 (문자열 안의 괄호도 정확히 처리)
+        obj, end = _DECODER.raw_decode(json_str)
+        return obj, end, False
     except json.JSONDecodeError:
         pass
 
-    # 시도 2: 중괄호 균형 맞추기 (로그에서 잘린 경우)
-    try:
-        depth = 0
-        end_idx = 0
-        for i, ch in enumerate(json_str):
-            if ch == '{':
-                depth += 1
-            elif ch == '}':
-                depth -= 1
-            if depth == 0 and i > 0:
-                end_idx = i + 1
+    for candidate, end in _repair_candidates(json_str):
+        try:
+            return codec.loads(candidate), end, True
+        except json.JSONDecodeError:
+            continue
+    return None, 0, False
+
+
+def _repair_candidates(json_str):
+    """
+    문자열/이스케이프 인식 1회 스캔으로 잘린 JSON을 닫는 후보 생성.
+    1순위: 끝까지 살린 꼬리 (잘린 문자열 값/숫자 포함), 2순위: 마지막 완결 지점에서 절단
+    스캔이 입력 끝에서 멈춘 경우(= 잘림)만 후보를 낸다 — 중간의 문법 오류는 복구하지 않음.
+    """
+    stack = ""          # 열린 컨테이너 ('{' / '[')
+    state = "V"         # V=값, VE=값 또는 ']', K=키, KE=키 또는 '}', C=':', N=',' 또는 닫기
+    safe_end = None     # 이 위치에서 자르고 닫으면 유효한 JSON
+    safe_stack = ""
+    tail = None
+    truncated = False   # 입력 끝에서 멈췄는지
+
+    for m in _JSON_TOKEN_RE.finditer(json_str):
+        tok = m.group()
+        c = tok[0]
+        if c in "{[":
+            if state not in ("V", "VE"):
                 break
-        if end_idx > 0:
-            return json.loads(json_str[:end_idx])
-    except (json.JSONDecodeError, IndexError):
-        pass
+            stack += c
+            state = "KE" if c == "{" else "VE"
+        elif c in "}]":
+            if not stack or _CLOSERS[stack[-1]] != c or state not in ("N", "KE", "VE"):
+                break
+            stack = stack[:-1]
+            state = "N"
+            if not stack:
+                break  # 최상위 값 완결 — raw_decode가 실패한 다른 이유가 있음
+        elif c == ",":
+            if state != "N" or not stack:
+                break
+            state = "K" if stack[-1] == "{" else "V"
+            continue
+        elif c == ":":
+            if state != "C":
+                break
+            state = "V"
+            continue
+        elif c == '"':
+            if not _string_closed(tok):
+                # 잘린 문자열 (입력 끝까지, 끝이 이스케이프 중간일 수 있음) — 값 위치면 닫아서 살린다
+                truncated = json_str[m.end():] in ("", "\\")
+                if truncated and state in ("V", "VE") and stack:
+                    tail = (json_str[:m.end()] + '"', stack)
+                break
+            if state in ("K", "KE"):
+                state = "C"
+                continue
+            if state not in ("V", "VE"):
+                break
+            state = "N"
+        else:
+            if state not in ("V", "VE"):
+                break
+            at_end = m.end() == len(json_str.rstrip())
+            if not _JSON_SCALAR_RE.fullmatch(tok):
+                truncated = at_end  # 끝에 걸친 덜 쓴 리터럴/숫자 (tru, 1e 등) 는 버리고 절단
+                break
+            if at_end:
+                # 끝에 걸친 숫자는 잘렸을 수 있지만 유효하면 그대로 살린다
+                tail = (json_str[:m.end()], stack)
+                truncated = True
+                break
+            state = "N"
 
-    # 시도 3: 후행 쓰레기 제거
-    try:
-        # 마지막 } 위치 찾기
-        last_brace = json_str.rfind('}')
-        if last_brace > 0:
-            return json.loads(json_str[:last_brace + 1])
-    except json.JSONDecodeError:
-        pass
+        if state == "N" or (state in ("KE", "VE") and len(stack) == 1):
+            safe_end = m.end()
+            safe_stack = stack
+    else:
+        truncated = True  # 문법 오류 없이 끝까지 — 열린 괄호만 남음
+
+    if not truncated:
+        return
+
+    if tail is not None:
+        text, open_stack = tail
+        yield text + "".join(_CLOSERS[ch] for ch in reversed(open_stack)), len(json_str)
+    if safe_end is not None and safe_stack:
+        yield (json_str[:safe_end]
+               + "".join(_CLOSERS[ch] for ch in reversed(safe_stack))), safe_end
 
-    return None
+
+def _string_closed(tok):
+    """문자열 토큰이 닫혔는지 — 마지막 따옴표 앞의 백슬래시가 짝수 개여야 닫는 따옴표"""
+    if len(tok) < 2 or not tok.endswith('"'):
+        return False
+    body = tok[1:-1]
+    return (len(body) - len(body.rstrip("\\"))) % 2 == 0
 
 
 # ═══════════════════════════════════════════════════
 # Step 2: 제품 자동 판별
 # ═══════════════════════════════════════════════════
-def detect_product(entry):
-    """추출된 정책 데이터에서 제품 자동 판별"""
-    data = entry.get("_data", {})
-    context = entry.get("_context", "")
+def _build_signature_index():
+    """PRODUCT_SIGNATURES → (키→제품 가중치 역색인, 소문자 키워드→제품 목록)"""
+    key_weights = defaultdict(lambda: defaultdict(int))
+    keyword_products = defaultdict(list)
+    for product, sigs in PRODUCT_SIGNATURES.items():
+        for key in sigs["json_keys"]:
+            key_weights[key][product] += 3  # JSON 키 매칭은 가중치 높음
+        for keyword in sigs["log_keywords"]:
+            keyword_products[keyword.lower()].append(product)
+    return (
+        {key: dict(weights) for key, weights in key_weights.items()},
+        {keyword: tuple(products) for keyword, products in keyword_products.items()},
+    )
+
+
+_KEY_WEIGHTS, _KEYWORD_PRODUCTS = _build_signature_index()
+_PRODUCT_ORDER = tuple(PRODUCT_SIGNATURES)
+
+
+_KEYWORD_CACHE_MAX_LEN = 128  # 이보다 긴 값(경로 목록 등)은 거의 반복되지 않으므로 캐시하지 않음
+_TIMESTAMP_CHARS = "0123456789 :.-/"
 
+
+def _match_keywords(token):
+    """문자열 하나(키 또는 값)에 포함된 로그 키워드 집합"""
+    text = token.lower()
+    if not text.isprintable():
+        # 제어문자는 json.dumps 이스케이프 형태 기준으로 매칭 (기존 동작과 동일)
+        text = json.dumps(text, ensure_ascii=False)
+    return frozenset(kw for kw in _KEYWORD_PRODUCTS if kw in text)
+
+
+_cached_keyword_hits = lru_cache(maxsize=16384)(_match_keywords)
+
+
+def _keyword_hits(token):
+    """_match_keywords — 반복되는 짧은 토큰(키, 짧은 값)만 캐시"""
+    if len(token) > _KEYWORD_CACHE_MAX_LEN:
+        return _match_keywords(token)
+    return _cached_keyword_hits(token)
+
+
+def _context_token(context):
+    """
+    컨텍스트에서 줄마다 다른 타임스탬프를 뗀 부분 ("260107 10:00:00:011 : imPolicy" → "imPolicy").
+    로그 키워드에는 숫자/구분자가 없으므로 매칭 결과는 원래 컨텍스트와 같다.
+    """
+    head, sep, tail = context.rpartition(" : ")
+    if sep and not head.strip(_TIMESTAMP_CHARS):
+        return tail
+    return context
+
+
+@lru_cache(maxsize=256)
+def _context_scores(context):
+    """로그 컨텍스트 토큰(_context_token)별 제품 점수 — 같은 토큰이 수천 번 반복되므로 캐시"""
     scores = defaultdict(int)
+    for keyword in _match_keywords(context):
+        for product in _KEYWORD_PRODUCTS[keyword]:
+            scores[product] += 5  # 컨텍스트 매칭은 가중치 최고
+    return dict(scores)
 
-    # JSON 키 기반 매칭
-    all_keys = _get_all_keys(data)
-    for product, sigs in PRODUCT_SIGNATURES.items():
-        for key in sigs["json_keys"]:
-            if key in all_keys:
-                scores[product] += 3  # JSON 키 매칭은 가중치 높음
 
-    # 로그 컨텍스트 키워드 매칭
-    context_lower = context.lower()
-    data_str = json.dumps(data, ensure_ascii=False).lower()
-    for product, sigs in PRODUCT_SIGNATURES.items():
-        for keyword in sigs["log_keywords"]:
-            if keyword.lower() in context_lower:
-                scores[product] += 5  # 컨텍스트 매칭은 가중치 최고
-            if keyword.lower() in data_str:
-                scores[product] += 1
+def _payload_keywords(key_index):
+    """키 색인의 모든 키/문자열 값에서 로그 키워드 수집 (직렬화 없이)"""
+    found = set()
+    for tokens in (key_index["keys"], key_index["strings"]):
+        for token in tokens:
+            hits = _keyword_hits(token)
+            if hits:
+                found |= hits
+    return found
+
+
+def detect_product(entry):
+    """추출된 정책 데이터에서 제품 자동 판별"""
+    entry = _as_entry(entry)
+    context = entry.context
+    key_index = _entry_keys(entry)
+
+    # JSON 키 기반 매칭 (역색인)
+    key_scores = defaultdict(int)
+    for key in key_index["keys"]:
+        weights = _KEY_WEIGHTS.get(key)
+        if weights:
+            for product, weight in weights.items():
+                key_scores[product] += weight
+
+    # 로그 컨텍스트 + 데이터 키워드 매칭
+    keyword_scores = defaultdict(int, _context_scores(_context_token(context)))
+    for keyword in _payload_keywords(key_index):
+        for product in _KEYWORD_PRODUCTS[keyword]:
+            keyword_scores[product] += 1
+
+    # 동점 시 우선순위: 키 매칭 제품 → 키워드 매칭 제품 (각각 시그니처 순서)
+    scores = {}
+    for product in _PRODUCT_ORDER:
+        if product in key_scores:
+            scores[product] = key_scores[product]
+    for product in _PRODUCT_ORDER:
+        if keyword_scores.get(product):
+            scores[product] = scores.get(product, 0) + keyword_scores[product]
 
     if not scores:
         return "Unknown"
@@ -366,17 +990,58 @@ def detect_product(entry):
     return best if scores[best] >= 3 else "Unknown"
 
 
-def _get_all_keys(obj, prefix=""):
+def _get_all_keys(obj):
     """중첩 JSON의 모든 키를 평탄화하여 반환"""
+    return _collect_keys(obj)["keys"]
+
+
+def _collect_keys(data):
+    """
+    중첩 JSON 1회 순회 (반복형, 레벨별 set 복사 없음)
+    모든 키, 문자열 값, 최상위 정책 ID 키, 정책 이름을 한 번에 수집
+    """
     keys = set()
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            keys.add(k)
-            keys.update(_get_all_keys(v, f"{prefix}{k}."))
-    elif isinstance(obj, list):
-        for item in obj:
-            keys.update(_get_all_keys(item, prefix))
-    return keys
+    strings = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            keys.update(node)
+            values = node.values()
+        elif isinstance(node, list):
+            values = node
+        else:
+            continue
+        for v in values:
+            if isinstance(v, str):
+                strings.add(v)
+            elif isinstance(v, (dict, list)):
+                stack.append(v)
+
+    is_dict = isinstance(data, dict)
+    return {
+        "data": data,
+        "keys": keys,
+        "strings": strings,
+        "id_key": _find_id_key(data) if is_dict else None,
+        "name": _extract_policy_name(data) if is_dict else None,
+    }
+
+
+def _entry_keys(entry):
+    """엔트리의 키 색인 — data 당 1회만 수집하고 entry.keys 에 캐시"""
+    key_index = _cached_keys(entry)
+    if key_index is None:
+        key_index = entry.keys = _collect_keys(entry.data)
+    return key_index
+
+
+def _cached_keys(entry):
+    """현재 data 에 대해 수집된 키 색인 (없거나 data 가 교체됐으면 None)"""
+    key_index = entry.keys
+    if key_index is not None and key_index["data"] is entry.data:
+        return key_index
+    return None
 
 
 # ═══════════════════════════════════════════════════
@@ -420,24 +1085,56 @@ def deduplicate(entries):
     """같은 정책 ID의 중복 제거 — 마지막(최신) 것만 유지"""
     seen = {}
 
-    for entry in entries:
-        data = entry["_data"]
-        product = entry.get("_product", "Unknown")
-
-        # 정책 ID 추출 (제품별로 다른 키 이름)
-        policy_id = None
-        for key in data:
-            if key.endswith("PolicyId") or key.endswith("TemplateId"):
-                policy_id = f"{product}:{key}:{data[key]}"
-                break
+    for entry in map(_as_entry, entries):
+        # 나중에 나온 것이 최신 (덮어쓰기)
+        seen[_dedup_key(entry)] = entry
 
-        if policy_id is None:
-            # ID가 없으면 컨텍스트 기반으로 키 생성
-            policy_id = f"{product}:{entry.get('_context', '')}:{entry['_line']}"
+    return list(seen.values())
 
-        # 나중에 나온 것이 최신 (덮어쓰기)
-        seen[policy_id] = entry
 
+def _dedup_key(entry):
+    """중복 판별 키 — 정책 ID 기반, 없으면 컨텍스트 + 줄번호"""
+    data = entry.data
+    product = entry.product or "Unknown"
+
+    # 정책 ID 추출 (제품별로 다른 키 이름) — 판별 단계에서 수집한 색인 재사용
+    key_index = _cached_keys(entry)
+    id_key = key_index["id_key"] if key_index else _find_id_key(data)
+    if id_key is not None:
+        return f"{product}:{id_key}:{data[id_key]}"
+
+    # ID가 없으면 컨텍스트 기반으로 키 생성
+    return f"{product}:{entry.context}:{entry.line}"
+
+
+def _find_id_key(data):
+    """첫 번째 ...PolicyId / ...TemplateId 키"""
+    for key in data:
+        if key.endswith("PolicyId") or key.endswith("TemplateId"):
+            return key
+    return None
+
+
+# 지문 계산 시 제외 — 같은 정책의 스냅샷마다 달라지는 래퍼 메타데이터
+_FINGERPRINT_EXCLUDED = frozenset(("_wrapper_id", "_wrapper_time"))
+
+
+def policy_fingerprint(data):
+    """정책 내용 지문 — 키 정렬한 마스킹 데이터의 해시 (요청/프로세스가 달라도 같은 값)"""
+    if isinstance(data, dict) and not _FINGERPRINT_EXCLUDED.isdisjoint(data):
+        data = {k: v for k, v in data.items() if k not in _FINGERPRINT_EXCLUDED}
+    canonical = codec.dumps(data, sort_keys=True, default=str)
+    return content_key("policy", canonical)
+
+
+def collapse_identical(entries):
+    """내용이 같은 정책(다른 줄/ID 키/입력) 하나로 — 마지막(최신) 것만 유지, 지문은 _fingerprint 에 기록"""
+    seen = {}
+    for entry in entries:
+        fingerprint = entry.fingerprint
+        if fingerprint is None:
+            fingerprint = entry.fingerprint = policy_fingerprint(entry.data)
+        seen[fingerprint] = entry
     return list(seen.values())
 
 
@@ -445,31 +1142,67 @@ def deduplicate(entries):
 # Step 5: 스마트 압축 + 민감정보 마스킹
 # ═══════════════════════════════════════════════════
 def compress_and_mask(data):
-    """목록 항목을 한 줄 형태로 압축 (항목 수는 유지!) + 민감 필드 마스킹"""
+    """목록 항목을 한 줄 형태로 압축 (항목 수는 유지!) + 민감 필드 마스킹
+
+    바뀌는 경로만 새로 만들고 손대지 않은 하위 객체는 원본과 공유 (읽기 전용으로 다룰 것)
+    """
     if isinstance(data, dict):
-        result = {}
-        for key, value in data.items():
-            # 민감 필드 마스킹
-            if key in SENSITIVE_FIELDS:
-                if value and str(value).strip():
-                    result[key] = "***설정됨***"
-                else:
-                    result[key] = "미설정"
-                continue
+        return _transform_dict(data)
+    if isinstance(data, list):
+        return _transform_list(data)
+    return data
 
-            # 목록 → 항목 수는 전부 유지, 각 항목만 한 줄로 압축
-            if key in COMPRESSIBLE_FIELDS and isinstance(value, list):
-                result[key] = _compact_list(key, value)
-                continue
 
-            # 재귀 처리
-            result[key] = compress_and_mask(value)
-        return result
+def _transform_dict(data):
+    changed = None
+    for key, value in data.items():
+        action = _FIELD_ACTIONS.get(key)
+        if action is not None:
+            new = action(key, value)
+        elif isinstance(value, (dict, list)):
+            new = compress_and_mask(value)
+        else:
+            continue
+        if new is not value:
+            if changed is None:
+                changed = {}
+            changed[key] = new
+    if changed is None:
+        return data
+    result = dict(data)  # 키 순서 유지
+    result.update(changed)
+    return result
 
-    elif isinstance(data, list):
-        return [compress_and_mask(item) for item in data]
 
-    return data
+def _transform_list(items):
+    result = None
+    for i, item in enumerate(items):
+        if isinstance(item, (dict, list)):
+            new = compress_and_mask(item)
+            if new is not item:
+                if result is None:
+                    result = list(items)
+                result[i] = new
+    return items if result is None else result
+
+
+def _mask_field(key, value):
+    """민감 필드 마스킹"""
+    if value and str(value).strip():
+        return "***설정됨***"
+    return "미설정"
+
+
+def _compact_field(key, value):
+    """목록 → 항목 수는 전부 유지, 각 항목만 한 줄로 압축 (목록이 아니면 재귀 처리)"""
+    if isinstance(value, list):
+        return _compact_list(key, value)
+    return compress_and_mask(value)
+
+
+# 필드명 → 처리 함수 (민감 필드가 압축 대상보다 우선)
+_FIELD_ACTIONS = {key: _compact_field for key in COMPRESSIBLE_FIELDS}
+_FIELD_ACTIONS.update({key: _mask_field for key in SENSITIVE_FIELDS})
 
 
 def _compact_list(key, items):
@@ -478,56 +1211,36 @@ def _compact_list(key, items):
         return []
 
     compacted = []
-
+    append = compacted.append
     for item in items:
         if not isinstance(item, dict):
-            compacted.append(item)
-            continue
-
+            append(item)
         # ── 프로세스 목록 (exceptProcessList 등) ──
-        if "processName" in item:
-            name = item.get("processName", "?")
-            sign = item.get("signs", item.get("sign", ""))
-            sha2 = item.get("sha2s", item.get("sha2", ""))
-            parts = [name]
+        elif "processName" in item:
+            sign = item["signs"] if "signs" in item else item.get("sign", "")
+            sha2 = item["sha2s"] if "sha2s" in item else item.get("sha2", "")
+            parts = [item["processName"]]
             if sign:
                 parts.append(f"서명:{sign}")
             if sha2:
                 parts.append("SHA2:있음")
             if item.get("isPassUncon"):
                 parts.append("무조건허용")
-            compacted.append(" | ".join(parts))
-            continue
-
+            append(" | ".join(parts))
         # ── 웹 제한 목록 ──
-        if "url" in item or "address" in item:
-            url = item.get("url", item.get("address", "?"))
-            compacted.append(url)
-            continue
-
+        elif "url" in item:
+            append(item["url"])
+        elif "address" in item:
+            append(item["address"])
         # ── 확장자 목록 ──
-        if "extension" in item:
-            compacted.append(item.get("extension", "?"))
-            continue
-
+        elif "extension" in item:
+            append(item["extension"])
         # ── 트리거 목록 (innoMark) ──
-        if "triggerValue" in item or "processName" in item:
-            val = item.get("triggerValue", item.get("processName", "?"))
-            compacted.append(val)
-            continue
-
+        elif "triggerValue" in item:
+            append(item["triggerValue"])
         # ── 일반: 키=값 한줄로 ──
-        parts = []
-        for k, v in item.items():
-            if k.startswith("_"):
-                continue
-            if v is None or v == "" or v == []:
-                continue
-            # 중첩 객체는 스킵
-            if isinstance(v, (dict, list)):
-                continue
-            parts.append(f"{k}={v}")
-        compacted.append(" | ".join(parts) if parts else str(item))
+        else:
+            append(_compact_generic_item(item))
 
     return {
         "_총개수": len(items),
@@ -535,6 +1248,20 @@ def _compact_list(key, items):
     }
 
 
+def _compact_generic_item(item):
+    parts = []
+    for k, v in item.items():
+        if k.startswith("_"):
+            continue
+        if v is None or v == "" or v == []:
+            continue
+        # 중첩 객체는 스킵
+        if isinstance(v, (dict, list)):
+            continue
+        parts.append(f"{k}={v}")
+    return " | ".join(parts) if parts else str(item)
+
+
 def _summarize_list(key, items):
     """목록을 한 줄 요약으로 압축 (디지털서명 등 보조용)"""
     if not items:
@@ -568,23 +1295,9 @@ def generate_ai_input(entries, sign_policies, errors):
     """전처리 완료된 데이터를 AI가 소화할 수 있는 포맷으로 변환"""
     output = {}
 
-    # 제품별 그룹핑
-    by_product = defaultdict(list)
-    for entry in entries:
-        product = entry.get("_product", "Unknown")
-        by_product[product].append(entry)
-
     # 제품별 정책 출력
-    for product, product_entries in by_product.items():
-        product_data = {}
-        for i, entry in enumerate(product_entries):
-            context = entry.get("_context", "")
-            # 정책 이름 추출
-            data = entry["_data"]
-            policy_name = _extract_policy_name(data)
-            key = policy_name or context or f"정책_{i+1}"
-            product_data[key] = data
-        output[product] = product_data
+    for product, key, entry in _policy_slots(entries):
+        output.setdefault(product, {})[key] = entry.data
 
     # 디지털서명 예외 (있으면)
     if sign_policies:
@@ -602,6 +1315,57 @@ def generate_ai_input(entries, sign_policies, errors):
     return output
 
 
+def policy_fingerprints(entries):
+    """generate_ai_input 과 같은 {제품: {정책키: 지문}} 구조"""
+    output = {}
+    for product, key, entry in _policy_slots(entries):
+        output.setdefault(product, {})[key] = entry.fingerprint
+    return output
+
+
+def policy_records(entries):
+    """
+    정책 하나당 레코드 (NDJSON 출력용) — generate_ai_input 처럼 문서 하나로 묶지 않고 yield
+    {"product", "policy_id", "name", "fingerprint", "data"(압축·마스킹된 정책)}
+    name 은 generate_ai_input 의 정책 키와 같다 (이름 → 컨텍스트 → 순번).
+    """
+    for product, name, entry in _policy_slots(entries):
+        if entry.fingerprint is None:
+            entry.fingerprint = policy_fingerprint(entry.data)
+        yield _policy_record(product, name, entry.fingerprint, entry.data)
+
+
+def _policy_record(product, name, fingerprint, data):
+    id_key = _find_id_key(data) if isinstance(data, dict) else None
+    return {
+        "product": product,
+        "policy_id": data[id_key] if id_key is not None else None,
+        "name": name,
+        "fingerprint": fingerprint,
+        "data": data,
+    }
+
+
+def iter_ndjson(records):
+    """레코드 → 줄바꿈으로 끝나는 compact JSON 한 줄씩"""
+    for record in records:
+        yield codec.dumps(record) + "\n"
+
+
+def _policy_slots(entries):
+    """(제품, 정책키, 엔트리) — 제품별로 묶고 정책 이름 → 컨텍스트 → 순번 순으로 키 결정"""
+    by_product = defaultdict(list)
+    for entry in map(_as_entry, entries):
+        by_product[entry.product or "Unknown"].append(entry)
+
+    for product, product_entries in by_product.items():
+        for i, entry in enumerate(product_entries):
+            # 정책 이름 추출
+            key_index = _cached_keys(entry)
+            policy_name = key_index["name"] if key_index else _extract_policy_name(entry.data)
+            yield product, policy_name or entry.context or f"정책_{i+1}", entry
+
+
 def _extract_policy_name(data):
     """정책 데이터에서 이름 추출"""
     name_keys = [
@@ -619,10 +1383,232 @@ def _extract_policy_name(data):
     return None
 
 
+# ═══════════════════════════════════════════════════
+# 파싱 결과 — 직렬화는 필요할 때 (캐시된 결과는 같은 예산으로 한 번만)
+# ═══════════════════════════════════════════════════
+# 파싱 캐시의 결과는 요청/스레드 간에 공유되므로 객체에 직렬화 결과를 써 넣지 않고
+# (입력 키, style, max_chars) → (문자열, 생략된 정책) 을 여기에 둔다.
+_SERIALIZED = LRUCache(256)
+
+
+class ParseResult(dict):
+    """
+    parse_input 결과 dict. 기존 키 그대로 사용 가능하고,
+    "clean_json" 은 꺼낼 때 직렬화한다 (policies만 쓰면 직렬화 비용 없음).
+    "fingerprints" 는 policies 와 같은 {제품: {정책키: 지문}} 구조.
+    만든 뒤에는 바꾸지 않는다 (파싱 캐시에 올라가면 여러 요청이 함께 읽는다).
+    input_key: parse_input 캐시 키 — 있으면 직렬화 결과를 _SERIALIZED 에서 재사용
+    """
+
+    def __init__(self, input_type, policies, policy_count, products_found,
+                 errors=(), clean_json=None, max_chars=None, fingerprints=None, input_key=None):
+        super().__init__(
+            input_type=input_type,
+            policies=policies,
+            policy_count=policy_count,
+            products_found=products_found,
+            errors=list(errors),
+            fingerprints=fingerprints or {},
+        )
+        self.max_chars = max_chars
+        self.input_key = input_key
+        self._passthrough = clean_json  # 파싱 실패 시 원문 그대로 전달
+        if clean_json is not None:
+            self["clean_json"] = clean_json
+
+    def __missing__(self, key):
+        if key != "clean_json":
+            raise KeyError(key)
+        return self.serialize("pretty", self.max_chars)
+
+    def get(self, key, default=None):
+        return self[key] if key == "clean_json" or key in self else default
+
+    def serialize(self, style="pretty", max_chars=None, timings=None):
+        """
+        style: "pretty" (indent=2) / "compact" (공백 없음)
+        max_chars: 문자 예산 — 초과하면 낮은 우선순위 필드부터 줄인 유효한 JSON (char_budget 참고)
+        캐시된 결과(input_key)는 같은 (style, max_chars) 를 한 번만 직렬화한다. policies 는 바뀌지 않는다.
+        timings: ParseTimings — "emergency_compress" 단계로 기록
+        """
+        return self._serialize(style, max_chars, timings)[0]
+
+    def serialize_kept(self, style="pretty", max_chars=None, timings=None):
+        """
+        serialize + 결과 문자열에 실제로 들어간 정책의 지문 목록 → (문자열, 지문 목록)
+        예산 초과로 통째 생략된 정책(_예산초과_생략)은 빠진다 — AI 가 본 정책만 분석 완료로 기록하기 위함
+        """
+        text, omitted = self._serialize(style, max_chars, timings)
+        kept = [fingerprint for section, table in self["fingerprints"].items()
+                for name, fingerprint in table.items() if (section, name) not in omitted]
+        return text, kept
+
+    def _serialize(self, style, max_chars, timings):
+        """→ (문자열, 통째 생략된 (섹션, 정책이름) 집합)"""
+        if self._passthrough is not None:
+            return self._passthrough, frozenset()
+        start = perf_counter()
+        memo_key = (self.input_key, style, max_chars) if self.input_key is not None else None
+        serialized = _SERIALIZED.get(memo_key) if memo_key is not None else None
+        cached = serialized is not None
+        if serialized is None:
+            serialized = _budget_serialize(self["policies"], max_chars, pretty=(style != "compact"))
+            if memo_key is not None:
+                _SERIALIZED.put(memo_key, serialized)
+        if timings is None and _TIMING_LISTENERS:
+            timings = ParseTimings()
+        if timings is not None:
+            timings.record("emergency_compress", perf_counter() - start,
+                           output_chars=len(serialized[0]), max_chars=max_chars, cached=cached)
+        return serialized
+
+    def iter_records(self):
+        """정책 하나당 레코드 (policy_records 형태) — 결과 문서를 직렬화하지 않고 yield"""
+        for section, table in self["fingerprints"].items():
+            policies = self["policies"][section]
+            for name, fingerprint in table.items():
+                yield _policy_record(section, name, fingerprint, policies[name])
+
+    def iter_ndjson(self):
+        """iter_records 를 NDJSON 줄로"""
+        return iter_ndjson(self.iter_records())
+
+    def without_policies(self, fingerprints):
+        """지문이 fingerprints 에 속한 정책을 뺀 새 결과 (이미 분석한 정책 건너뛰기용)"""
+        skip = set(fingerprints)
+        if self._passthrough is not None or not skip:
+            return self
+        policies = {}
+        kept = {}
+        removed = 0
+        for section, value in self["policies"].items():
+            table = self["fingerprints"].get(section)
+            if table is None:
+                policies[section] = value  # _디지털서명_예외 / _로그_에러
+                continue
+            remaining = {key: data for key, data in value.items() if table[key] not in skip}
+            removed += len(value) - len(remaining)
+            if remaining:
+                policies[section] = remaining
+                kept[section] = {key: table[key] for key in remaining}
+        return ParseResult(self["input_type"], policies, self["policy_count"] - removed,
+                           sorted(kept), self["errors"], max_chars=self.max_chars,
+                           fingerprints=kept)
+
+
+# ═══════════════════════════════════════════════════
+# 파싱 결과 캐시 — 입력 해시 + 파서 버전 기준
+# ═══════════════════════════════════════════════════
+PARSER_VERSION = "2.8"
+
+
+def _result_to_cache(result):
+    stored = dict(result)
+    stored["clean_json"] = result._passthrough
+    stored["max_chars"] = result.max_chars
+    stored["input_key"] = result.input_key
+    return stored
+
+
+def _result_from_cache(stored):
+    return ParseResult(**stored)
+
+
+_PARSE_CACHE = TieredCache(LRUCache(64), encode=_result_to_cache, decode=_result_from_cache)
+
+
+def configure_parse_cache(max_entries=64, db_path=None, db_max_entries=1000):
+    """파싱 캐시 설정 — db_path 지정 시 SQLite 2단 캐시 (워커 프로세스 간 공유)"""
+    global _PARSE_CACHE
+    disk = SQLiteCache(db_path, table="parse_cache", max_entries=db_max_entries) if db_path else None
+    _PARSE_CACHE = TieredCache(
+        LRUCache(max_entries), disk, encode=_result_to_cache, decode=_result_from_cache
+    )
+
+
+def parse_cache_stats():
+    """파싱 캐시 적중/미스/축출 통계"""
+    return _PARSE_CACHE.stats()
+
+
+# ═══════════════════════════════════════════════════
+# 단계별 계측 — 소요 시간 + 크기 (API parser_info.timings / 메트릭 수집 훅)
+# ═══════════════════════════════════════════════════
+PARSE_STAGES = ("extract", "unwrap", "classify", "dedup", "compress", "emit", "emergency_compress")
+
+_TIMING_LISTENERS = []
+
+
+def add_timing_listener(listener):
+    """listener(stage, record) — 단계 측정이 끝날 때마다 호출 (record: seconds + 크기 값)"""
+    _TIMING_LISTENERS.append(listener)
+
+
+def remove_timing_listener(listener):
+    if listener in _TIMING_LISTENERS:
+        _TIMING_LISTENERS.remove(listener)
+
+
+def _notify(stage, record):
+    for listener in list(_TIMING_LISTENERS):
+        try:
+            listener(stage, dict(record))
+        except Exception:
+            pass  # 수집기 오류가 파싱을 막지 않도록
+
+
+class ParseTimings:
+    """
+    요청 하나의 단계별 기록. parse_input(timings=...) / serialize(timings=...) 에 같은 객체를 넘긴다.
+    lap(stage): 직전 lap 이후 경과 시간을 stage 에 누적 (스트리밍 루프 안에서 사용)
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._last = perf_counter()
+
+    def start(self):
+        self._last = perf_counter()
+
+    def lap(self, stage, **sizes):
+        now = perf_counter()
+        self.add(stage, now - self._last, **sizes)
+        self._last = now
+
+    def add(self, stage, seconds, **sizes):
+        record = self.stages.get(stage)
+        if record is None:
+            record = self.stages[stage] = {"seconds": 0.0}
+        record["seconds"] += seconds
+        record.update(sizes)
+        return record
+
+    def record(self, stage, seconds, **sizes):
+        """측정 하나를 누적하고 바로 구독자에게 전달"""
+        self.add(stage, seconds, **sizes)
+        _notify(stage, dict(sizes, seconds=seconds))
+
+    def publish(self):
+        for stage, record in self.stages.items():
+            _notify(stage, record)
+
+    def as_dict(self):
+        stages = {}
+        for stage, record in self.stages.items():
+            stages[stage] = {k: v for k, v in record.items() if k != "seconds"}
+            stages[stage]["ms"] = round(record["seconds"] * 1000, 3)
+        total = sum(record["seconds"] for record in self.stages.values())
+        return {"total_ms": round(total * 1000, 3), "stages": stages}
+
+
+def _byte_length(text):
+    return len(text) if text.isascii() else len(text.encode("utf-8", errors="surrogatepass"))
+
+
 # ═══════════════════════════════════════════════════
 # 메인 인터페이스 — app.py에서 호출
 # ═══════════════════════════════════════════════════
-def parse_input(raw_input):
+def parse_input(raw_input, workers=None, use_cache=False, timings=None):
     """
     메인 함수: 어떤 형태의 입력이든 받아서 AI에 보낼 깨끗한 데이터 반환
 
@@ -631,177 +1617,654 @@ def parse_input(raw_input):
             "input_type": str,           # 입력 타입
             "policies": dict,            # 제품별 정책 데이터
             "policy_count": int,         # 추출된 정책 수
-            "products_found": list,      # 발견된 제품 목록
+            "products_found": list,      # 발견된 제품 목록 (이름순 — 프롬프트/캐시 키가 실행마다 같도록)
             "errors": list,              # 로그 에러 (있으면)
-            "clean_json": str,           # AI에 보낼 최종 JSON 문자열
+            "clean_json": str,           # AI에 보낼 최종 JSON 문자열 (접근 시 직렬화)
         }
+
+    workers: 2 이상이면 큰 로그를 프로세스 풀에서 구간별 병렬 처리
+    use_cache: 같은 입력(+파서 버전)의 결과를 캐시에서 재사용 — 반환값은 공유되므로 읽기 전용
+    timings: ParseTimings — 단계별 시간/크기 기록 (PARSE_STAGES, 캐시 적중 시 "cache")
     """
-    input_type = detect_input_type(raw_input)
+    if timings is None and _TIMING_LISTENERS:
+        timings = ParseTimings()
+
+    if not use_cache:
+        result = _parse_input(raw_input, workers, timings)
+    else:
+        if timings is not None:
+            timings.start()
+        key = content_key(PARSER_VERSION, raw_input)
+        result = _PARSE_CACHE.get(key)
+        if result is None:
+            result = _parse_input(raw_input, workers, timings)
+            # 파싱 실패(원문을 그대로 넘기는 결과)는 입력 전체를 붙잡게 되므로 캐시하지 않음
+            if result._passthrough is None:
+                result.input_key = key  # 공유 전에만 설정
+                _PARSE_CACHE.put(key, result)
+        elif timings is not None:
+            timings.lap("cache", hit=True, input_bytes=_byte_length(raw_input))
+
+    if timings is not None:
+        timings.publish()
+    return result
+
+
+def _parse_input(raw_input, workers=None, timings=None):
+    """parse_input 본체 (캐시 없이 실행)"""
+    if timings is None:
+        timings = ParseTimings()  # 기록만 하고 버림
+    timings.start()
+    timings.add("extract", 0.0, input_bytes=_byte_length(raw_input))
+
+    input_type, decoded = classify_input(raw_input)
 
     # ── 복수 JSON이 연결된 경우 ({...}{...} 또는 {...}\n{...}) ──
     if input_type == "multi_json":
-        jsons = extract_multiple_jsons(raw_input)
+        # 판별 단계의 분리 결과를 이어서 사용 (구분선 판별이면 여기서 처음 분리)
+        pieces = decoded if decoded is not None else _split_json_objects(raw_input)
+        jsons = [obj for _, obj in pieces if obj is not None]
+        timings.lap("extract", entries=len(jsons))
         if jsons:
             entries = []
             for i, data in enumerate(jsons):
                 unwrapped = unwrap_policy(data)
+                timings.lap("unwrap")
                 masked = compress_and_mask(unwrapped)
-                entry = {
-                    "_source": "multi_json",
-                    "_line": i,
-                    "_context": f"정책_{i+1}",
-                    "_data": masked
-                }
-                entry["_product"] = detect_product(entry)
+                timings.lap("compress")
+                entry = PolicyEntry("multi_json", i, f"정책_{i+1}", masked)
+                entry.product = detect_product(entry)
                 entries.append(entry)
+                timings.lap("classify")
 
-            unique = deduplicate(entries)
+            unique = collapse_identical(deduplicate(entries))
+            timings.lap("dedup", entries=len(unique))
             result_data = generate_ai_input(unique, [], [])
-            products = list(set(e["_product"] for e in unique))
-
-            clean_json = json.dumps(result_data, indent=2, ensure_ascii=False)
-            MAX_CHARS = 30000
-            if len(clean_json) > MAX_CHARS:
-                clean_json = _emergency_compress(result_data, MAX_CHARS)
-
-            return {
-                "input_type": "multi_json",
-                "policies": result_data,
-                "policy_count": len(unique),
-                "products_found": products,
-                "errors": [],
-                "clean_json": clean_json
-            }
+            products = sorted(set(e.product for e in unique))
+
+            result = ParseResult("multi_json", result_data, len(unique), products,
+                                 max_chars=DEFAULT_CHAR_BUDGET,
+                                 fingerprints=policy_fingerprints(unique))
+            timings.lap("emit", entries=len(unique))
+            return result
 
     # ── 깨끗한 JSON이면 최소 전처리만 ──
     if input_type in ("clean_json", "clean_json_array"):
         try:
-            data = json.loads(raw_input)
+            data = decoded  # 판별 단계에서 이미 디코딩됨
+            timings.lap("extract", entries=len(data) if isinstance(data, list) else 1)
             if isinstance(data, list):
                 # 배열이면 각 항목 처리
                 entries = []
                 for i, item in enumerate(data):
                     if isinstance(item, dict):
                         unwrapped = unwrap_policy(item)
+                        timings.lap("unwrap")
                         masked = compress_and_mask(unwrapped)
-                        entry = {
-                            "_source": "clean_json",
-                            "_line": i,
-                            "_context": "",
-                            "_data": masked
-                        }
-                        entry["_product"] = detect_product(entry)
+                        timings.lap("compress")
+                        entry = PolicyEntry("clean_json", i, "", masked)
+                        entry.product = detect_product(entry)
                         entries.append(entry)
+                        timings.lap("classify")
             else:
                 unwrapped = unwrap_policy(data)
+                timings.lap("unwrap")
                 masked = compress_and_mask(unwrapped)
-                entry = {
-                    "_source": "clean_json",
-                    "_line": 0,
-                    "_context": "",
-                    "_data": masked
-                }
-                entry["_product"] = detect_product(entry)
+                timings.lap("compress")
+                entry = PolicyEntry("clean_json", 0, "", masked)
+                entry.product = detect_product(entry)
                 entries = [entry]
+                timings.lap("classify")
 
+            entries = collapse_identical(entries)
+            timings.lap("dedup", entries=len(entries))
             result_data = generate_ai_input(entries, [], [])
-            products = list(set(e["_product"] for e in entries))
-
-            return {
-                "input_type": input_type,
-                "policies": result_data,
-                "policy_count": len(entries),
-                "products_found": products,
-                "errors": [],
-                "clean_json": json.dumps(result_data, indent=2, ensure_ascii=False)
-            }
+            products = sorted(set(e.product for e in entries))
+
+            result = ParseResult(input_type, result_data, len(entries), products,
+                                 fingerprints=policy_fingerprints(entries))
+            timings.lap("emit", entries=len(entries))
+            return result
         except Exception as e:
-            return {
-                "input_type": "error",
-                "policies": {},
-                "policy_count": 0,
-                "products_found": [],
-                "errors": [str(e)],
-                "clean_json": raw_input
-            }
+            return ParseResult("error", {}, 0, [], [str(e)], clean_json=raw_input)
 
     # ── 더러운 로그면 전체 파이프라인 실행 ──
-    # Step 1: JSON 추출
-    extracted, sign_policies, errors = extract_json_from_log(raw_input)
+    if workers and workers > 1 and len(raw_input) > _PARALLEL_MIN_CHARS:
+        seen, sign_policies, errors = _collect_parallel(
+            _scan_text_chunk, _text_chunks(raw_input, workers), workers
+        )
+        # 언래핑/판별/중복 제거는 워커 안에서 함께 실행되어 extract 에 포함
+        timings.lap("extract", workers=workers)
+    else:
+        seen, sign_policies, errors = _collect_log_events(
+            _scan_lines(_iter_text_lines(raw_input)), timings
+        )
+    return _finish_log_parse(seen, sign_policies, errors, input_type, raw_input, timings)
 
-    if not extracted and not sign_policies:
-        # JSON을 하나도 못 찾았으면 원본 그대로 반환
-        return {
-            "input_type": "no_json_found",
-            "policies": {},
-            "policy_count": 0,
-            "products_found": [],
-            "errors": ["로그에서 정책 JSON을 찾지 못했습니다."],
-            "clean_json": raw_input
-        }
 
-    # Step 2: 래퍼 언래핑
-    for entry in extracted:
-        entry["_data"] = unwrap_policy(entry["_data"])
+def parse_log_file(source, encoding="utf-8", workers=None, timings=None, max_line=None):
+    """
+    대용량 로그 파일용 스트리밍 파이프라인.
+    source: 파일 경로 (gzip/bz2/zip 자동 해제) 또는 바이너리 파일 객체 (parse_input과 같은 형태의 dict 반환)
+            압축된 파일 객체는 open_log_stream 으로 감싸서 넘긴다
+    workers: 2 이상이면 줄 단위로 자른 구간을 프로세스 풀에서 병렬 처리 (압축되지 않은 경로 입력만)
+    메모리 사용량은 로그 크기가 아니라 고유 정책 수에 비례한다.
+    timings: parse_input 과 같은 ParseTimings
+    max_line: 한 줄 최대 바이트 (순차 처리만, iter_log_lines 참고)
+    """
+    if timings is None and _TIMING_LISTENERS:
+        timings = ParseTimings()
+    clock = timings if timings is not None else ParseTimings()
+    clock.start()
+    is_path = isinstance(source, (str, bytes, os.PathLike))
+    if is_path:
+        clock.add("extract", 0.0, input_bytes=os.path.getsize(source))
+
+    if workers and workers > 1 and _splittable(source):
+        seen, sign_policies, errors = _collect_parallel(
+            _scan_file_chunk, _file_chunks(source, encoding, workers), workers
+        )
+        clock.lap("extract", workers=workers)
+    else:
+        seen, sign_policies, errors = _collect_log_events(iter_log_events(source, encoding, max_line),
+                                                          clock)
+    result = _finish_log_parse(seen, sign_policies, errors, "log_file", "", clock)
+    if timings is not None:
+        timings.publish()
+    return result
+
 
-    # Step 3: 제품 판별
-    for entry in extracted:
-        entry["_product"] = detect_product(entry)
+def parse_stream(fileobj, encoding="utf-8", timings=None, max_bytes=None, max_line=None, max_json=None):
+    """
+    업로드 스트림 파싱 — 압축(gzip/bz2/zip)은 풀면서 읽는다.
+    첫 글자가 '{' / '[' 인 JSON 문서(관리 콘솔 내보내기)는 전체를 읽어 parse_input 으로,
+    그 외(에이전트 로그)는 parse_log_file 스트리밍 파이프라인으로 처리한다.
+    상한 (None 이면 제한 없음, 넘으면 InputTooLarge):
+      max_bytes: 풀린 전체 크기 / max_line: 로그 한 줄 크기 / max_json: JSON 문서 크기 (문서는 통째로 읽으므로)
+    """
+    stream = open_log_stream(fileobj, max_bytes)
+    if stream.peek(64).lstrip(b" \t\r\n\xef\xbb\xbf")[:1] in (b"{", b"["):
+        data = stream.read() if max_json is None else read_json_bytes(stream, max_json)
+        return parse_input(data.decode(encoding, errors="replace"), timings=timings)
+    return parse_log_file(stream, encoding, timings=timings, max_line=max_line)
 
-    # Step 4: 중복 제거
-    unique = deduplicate(extracted)
 
-    # Step 5: 압축 + 마스킹
-    for entry in unique:
-        entry["_data"] = compress_and_mask(entry["_data"])
+def _collect_log_events(events, timings=None):
+    """추출 이벤트 스트림 → 언래핑/판별/중복제거 (seen, 서명예외, 에러)"""
+    if timings is None:
+        timings = ParseTimings()
+    seen = {}
+    sign_policies = []
+    errors = []
+    extracted = 0
+
+    # Step 1~4: JSON 추출 → 래퍼 언래핑 → 제품 판별 → 중복 제거 (스트리밍)
+    # 각 lap 은 직전 lap 이후 시간 — 스캐너가 다음 엔트리를 만드는 시간은 extract 로 집계
+    for kind, item in events:
+        if kind == "entry":
+            extracted += 1
+            timings.lap("extract")
+            item.data = unwrap_policy(item.data)
+            timings.lap("unwrap")
+            item.product = detect_product(item)
+            timings.lap("classify")
+            # 나중에 나온 것이 최신 (덮어쓰기)
+            seen[_dedup_key(item)] = item
+            timings.lap("dedup")
+        elif kind == "sign":
+            sign_policies.append(item)
+        else:
+            errors.append(item)
+
+    timings.lap("extract", entries=extracted, signs=len(sign_policies), errors=len(errors))
+    timings.add("dedup", 0.0, entries=len(seen))
+    return seen, sign_policies, errors
+
+
+def _prepare_entry(entry):
+    """래퍼 언래핑 + 제품 판별 후 중복 판별 키 반환"""
+    entry.data = unwrap_policy(entry.data)
+    entry.product = detect_product(entry)
+    return _dedup_key(entry)
+
+
+def _finish_log_parse(seen, sign_policies, errors, input_type, raw_input, timings=None):
+    """중복 제거된 엔트리 → 압축/마스킹 → AI 입력 생성"""
+    if timings is None:
+        timings = ParseTimings()
+    if not seen and not sign_policies:
+        # JSON을 하나도 못 찾았으면 원본 그대로 반환
+        return ParseResult("no_json_found", {}, 0, [],
+                           ["로그에서 정책 JSON을 찾지 못했습니다."], clean_json=raw_input)
+
+    unique = _compress_unique(seen, timings)
 
     # Step 6: AI 입력 생성
     result_data = generate_ai_input(unique, sign_policies, errors)
-    products = list(set(e["_product"] for e in unique))
+    products = sorted(set(e.product for e in unique))
 
-    clean_json = json.dumps(result_data, indent=2, ensure_ascii=False)
+    # 토큰 예산은 직렬화 시 적용 (clean_json 기본값 DEFAULT_CHAR_BUDGET)
+    result = ParseResult(input_type, result_data, len(unique), products,
+                         [e["_message"] for e in errors], max_chars=DEFAULT_CHAR_BUDGET,
+                         fingerprints=policy_fingerprints(unique))
+    timings.lap("emit", entries=len(unique))
+    return result
 
-    # 토큰 제한 체크 (대략 1글자 = 1토큰 기준, 30000자 제한)
-    MAX_CHARS = 30000
-    if len(clean_json) > MAX_CHARS:
-        # 너무 크면 추가 압축
-        clean_json = _emergency_compress(result_data, MAX_CHARS)
 
-    return {
-        "input_type": input_type,
-        "policies": result_data,
-        "policy_count": len(unique),
-        "products_found": products,
-        "errors": [e["_message"] for e in errors] if errors else [],
-        "clean_json": clean_json
-    }
+def _compress_unique(seen, timings):
+    """Step 5: 중복 제거된 엔트리 압축/마스킹 + 내용이 같은 정책 합치기"""
+    unique = list(seen.values())
+    for entry in unique:
+        entry.data = compress_and_mask(entry.data)
+        entry.keys = None  # 압축 전 데이터를 붙잡고 있는 키 색인 해제
+    timings.lap("compress", entries=len(unique))
+
+    # 내용이 같은 정책은 ID/줄이 달라도 하나로
+    unique = collapse_identical(unique)
+    timings.lap("dedup", entries=len(unique))
+    return unique
+
+
+def iter_log_records(source, encoding="utf-8", workers=None, timings=None):
+    """
+    parse_log_file 의 정책 단위 스트리밍 버전 — 전체 결과 dict/JSON 문자열을 만들지 않고
+    중복 제거된 정책마다 policy_records 레코드를 yield (서명 예외/로그 에러는 포함하지 않음)
+    """
+    if timings is None and _TIMING_LISTENERS:
+        timings = ParseTimings()
+    clock = timings if timings is not None else ParseTimings()
+    clock.start()
+    if workers and workers > 1 and _splittable(source):
+        seen, _, _ = _collect_parallel(_scan_file_chunk, _file_chunks(source, encoding, workers), workers)
+        clock.lap("extract", workers=workers)
+    else:
+        seen, _, _ = _collect_log_events(iter_log_events(source, encoding), clock)
+    unique = _compress_unique(seen, clock)
+    del seen
+    count = 0
+    for record in policy_records(unique):
+        count += 1
+        yield record
+    clock.lap("emit", entries=count)
+    if timings is not None:
+        timings.publish()
+
+
+# ═══════════════════════════════════════════════════
+# 대용량 로그 병렬 처리 — 줄 단위 구간 분할 + 순서 보존 병합
+# ═══════════════════════════════════════════════════
+_CHUNK_BYTES = 16 * 1024 * 1024      # 구간 하나의 목표 크기
+_PARALLEL_MIN_CHARS = 1024 * 1024    # 이보다 작은 입력은 병렬화 이득이 없음
+
+
+def _collect_parallel(scan_chunk, chunks, workers):
+    """
+    구간별 결과를 원래 순서대로 병합 — 구간 내 줄번호를 전체 줄번호로 보정하므로
+    deduplicate 의 "마지막 등장이 이긴다" 규칙이 순차 처리와 동일하게 유지된다.
+    """
+    seen = {}
+    sign_policies = []
+    errors = []
+    line_offset = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for entries, chunk_signs, chunk_errors, n_lines in pool.map(scan_chunk, chunks):
+            for entry in entries:
+                entry.line += line_offset
+                seen[_dedup_key(entry)] = entry
+            for error in chunk_errors:
+                error["_line"] += line_offset
+            sign_policies.extend(chunk_signs)
+            errors.extend(chunk_errors)
+            line_offset += n_lines
+
+    return seen, sign_policies, errors
+
+
+def _scan_numbered_chunk(numbered_lines):
+    """워커: 구간 하나를 추출/언래핑/판별/구간 내 중복제거 (줄번호는 구간 기준)"""
+    counter = _LineCounter(numbered_lines)
+    seen, sign_policies, errors = _collect_log_events(_scan_lines(counter))
+    entries = list(seen.values())
+    for entry in entries:
+        entry.keys = None  # 프로세스 간 전송량 절감 (병합 후 다시 수집 불필요)
+    return entries, sign_policies, errors, counter.count
+
+
+def _scan_text_chunk(text):
+    return _scan_numbered_chunk(_iter_text_lines(text))
+
+
+def _scan_file_chunk(chunk):
+    path, start, end, encoding = chunk
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _scan_numbered_chunk(iter_log_lines(io.BytesIO(data), encoding))
+
+
+class _LineCounter:
+    """(줄번호, 줄) 이터레이터를 감싸 구간의 전체 줄 수를 기록 (빈 줄 포함)"""
+
+    def __init__(self, numbered_lines):
+        self._it = iter(numbered_lines)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line_num, line = next(self._it)
+        self.count = line_num
+        return line_num, line
+
+
+def _text_chunks(text, workers):
+    """문자열을 줄 경계에 맞춰 구간으로 자른다"""
+    size = max(len(text) // workers, 1)
+    size = min(size, _CHUNK_BYTES)
+    pos = 0
+    while pos < len(text):
+        end = text.find("\n", pos + size)
+        end = len(text) if end < 0 else end + 1
+        yield text[pos:end]
+        pos = end
+
+
+def _file_chunks(path, encoding, workers):
+    """파일을 줄 경계에 맞춘 (path, start, end, encoding) 바이트 구간으로 나눈다"""
+    total = os.path.getsize(path)
+    size = max(min(total // workers, _CHUNK_BYTES), 1)
+    with open(path, "rb") as f:
+        start = 0
+        while start < total:
+            f.seek(min(start + size, total))
+            f.readline()  # 줄 중간이면 다음 줄 시작까지
+            end = max(f.tell(), start + 1)
+            yield path, start, min(end, total), encoding
+            start = end
+
+
+# ═══════════════════════════════════════════════════
+# 실시간 로그 추적 — 추가된 바이트만 증분 파싱 (tail -f)
+# ═══════════════════════════════════════════════════
+class IncrementalLogParser:
+    """
+    파일 오프셋, 미완성 마지막 줄, 중복제거 상태(seen)를 기억하는 증분 파서.
+    feed()/poll() 은 새로 붙은 구간만 처리하고 추가·변경된 정책을 돌려준다.
+    """
+
+    def __init__(self, path=None, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self.reset()
+
+    def reset(self):
+        """처음부터 다시 (로그 회전/잘림 시)"""
+        self.offset = 0
+        self.line_count = 0
+        self.seen = {}
+        self.sign_policies = []
+        self.errors = []
+        self._partial = b""
+
+    def poll(self):
+        """path 파일에서 마지막 오프셋 이후 추가된 바이트만 읽어 처리"""
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            self.reset()  # 파일이 줄었으면 회전된 것으로 보고 재시작
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        return self.feed(data)
+
+    def feed(self, data):
+        """
+        새 바이트 처리 — 완결된 줄만 파싱하고 마지막 미완성 줄은 다음 호출로 넘긴다.
+        Returns: {"added": [entry, ...], "changed": [entry, ...]}
+        """
+        self.offset += len(data)
+        buffer = self._partial + data
+        cut = buffer.rfind(b"\n") + 1
+        self._partial = buffer[cut:]
+        return self._process(buffer[:cut])
+
+    def flush(self):
+        """남아있는 미완성 마지막 줄을 완결된 줄로 보고 처리 (파일 종료 시)"""
+        tail, self._partial = self._partial, b""
+        return self._process(tail)
+
+    def result(self):
+        """현재까지의 유효 정책으로 parse_input 과 같은 형태의 결과 생성"""
+        # 압축 단계가 엔트리를 바꾸므로 복사본으로 생성 (내부 상태 유지)
+        seen = {key: entry.copy() for key, entry in self.seen.items()}
+        return _finish_log_parse(seen, list(self.sign_policies), list(self.errors),
+                                 "log_follow", "")
+
+    def _process(self, chunk):
+        added = {}
+        changed = {}
+        if not chunk:
+            return {"added": [], "changed": []}
+
+        base = self.line_count
+        numbered = ((base + n, line) for n, line in iter_log_lines(io.BytesIO(chunk), self.encoding))
+        for kind, item in _scan_lines(numbered):
+            if kind == "entry":
+                key = _prepare_entry(item)
+                previous = self.seen.get(key)
+                self.seen[key] = item
+                if previous is None or key in added:
+                    added[key] = item
+                elif previous.data != item.data:
+                    changed[key] = item
+            elif kind == "sign":
+                self.sign_policies.append(item)
+            else:
+                self.errors.append(item)
+
+        self.line_count += chunk.count(b"\n") + (0 if chunk.endswith(b"\n") else 1)
+        return {"added": list(added.values()), "changed": list(changed.values())}
 
 
 def _emergency_compress(data, max_chars):
-    """비상 압축 — 토큰 한계 초과 시"""
-    # 1차: indent 제거
-    compact = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
-    if len(compact) <= max_chars:
-        return compact
+    """비상 압축 — 토큰 한계 초과 시 (원본 data 는 변경하지 않음)"""
+    return budget_serialize(data, max_chars, pretty=False)
 
-    # 2차: 배열 항목 더 줄이기
-    if isinstance(data, dict):
-        for key in data:
-            if isinstance(data[key], dict):
-                for inner_key in data[key]:
-                    val = data[key][inner_key]
-                    if isinstance(val, list) and len(val) > 3:
-                        data[key][inner_key] = val[:3] + [f"... 외 {len(val)-3}개"]
-                    elif isinstance(val, dict):
-                        for k, v in val.items():
-                            if isinstance(v, list) and len(v) > 3:
-                                val[k] = v[:3] + [f"... 외 {len(v)-3}개"]
 
-    compact = json.dumps(data, ensure_ascii=False, indent=1)
-    if len(compact) > max_chars:
-        compact = compact[:max_chars] + "\n... (토큰 제한으로 일부 생략)"
+# ═══════════════════════════════════════════════════
+# 토큰 예산 직렬화 — 낮은 우선순위부터 줄이며 크기 추적, 항상 유효한 JSON
+# ═══════════════════════════════════════════════════
+def char_budget(feature=None, model=None):
+    """기능별 예산과 모델별 상한 중 작은 값 (문자 수)"""
+    budget = FEATURE_CHAR_BUDGETS.get(feature, DEFAULT_CHAR_BUDGET)
+    model_limit = MODEL_CHAR_BUDGETS.get(model)
+    return min(budget, model_limit) if model_limit else budget
+
 
-    return compact
+def budget_serialize(data, max_chars=None, pretty=True):
+    """
+    generate_ai_input 결과를 max_chars 이내의 JSON 문자열로 직렬화.
+    초과 시 정책별 크기를 추적하면서 큰 정책부터 단계적으로 줄인다:
+      1) 🟡/메타 필드 제거  2) 긴 목록·문자열 요약  3) 중간 우선순위 필드 제거
+      4) 정책/부가 섹션 통째 생략
+    """
+    return _budget_serialize(data, max_chars, pretty)[0]
+
+
+def _budget_serialize(data, max_chars, pretty):
+    """budget_serialize → (문자열, 통째 생략된 정책의 (섹션, 정책이름) 집합)"""
+    if pretty:
+        text = codec.dumps(data, pretty=True)
+        if max_chars is None or len(text) <= max_chars:
+            return text, frozenset()
+    text = _dumps_compact(data)
+    if max_chars is None or len(text) <= max_chars:
+        return text, frozenset()
+    if not isinstance(data, dict):
+        return _budget_fallback(data, max_chars), frozenset()
+
+    # 슬롯: [섹션키, 정책이름(None=섹션 전체), 값, 직렬화 길이, "정책이름": 길이]
+    slots = []
+    for section, value in data.items():
+        if _is_policy_group(section, value):
+            for name, policy in value.items():
+                slots.append([section, name, policy, len(_dumps_compact(policy)),
+                              len(_dumps_compact(name)) + 1])
+        else:
+            slots.append([section, None, value, len(_dumps_compact(value)), 0])
+
+    stages = (
+        lambda section, value: _drop_fields(section, value, 1),
+        lambda section, value: _shrink_values(value),
+        lambda section, value: _drop_fields(section, value, 2),
+    )
+    total = _slots_size(slots)
+    for stage in stages:
+        # 큰 것부터 줄이고 예산에 들어오면 즉시 중단 (작은 정책은 원형 유지)
+        for slot in sorted(slots, key=lambda s: -s[3]):
+            if total <= max_chars:
+                break
+            reduced = stage(slot[0], slot[2])
+            if reduced is not slot[2]:
+                size = len(_dumps_compact(reduced))
+                total += size - slot[3]  # 구조(키/구분자)는 그대로, 값 크기만 변함
+                slot[2] = reduced
+                slot[3] = size
+
+    # 4단계: 부가 섹션 → 큰 정책 순으로 통째 생략 (같은 크기면 뒤쪽 정책부터)
+    # 남은 슬롯 수를 섹션별로 세면서 빠지는 슬롯의 크기(+구분자)만 total 에서 뺀다
+    omitted = defaultdict(int)
+    remaining = defaultdict(int)
+    for slot in slots:
+        remaining[slot[0]] += 1
+    n_sections = len(remaining)
+    dropped = set()
+    omitted_policies = set()
+    for slot in sorted(reversed(slots), key=lambda s: (s[1] is not None, -s[3])):
+        marker = 0
+        if omitted:
+            marker = len('"_예산초과_생략":') + len(_dumps_compact(omitted)) + (1 if n_sections else 0)
+        if total + marker <= max_chars:
+            break
+        section, name, _, size, key_size = slot
+        remaining[section] -= 1
+        if remaining[section]:
+            total -= key_size + size + 1
+        else:
+            # 섹션의 마지막 슬롯 — 섹션 키와 (정책 묶음이면) 중괄호, 섹션 간 구분자까지 빠짐
+            n_sections -= 1
+            inner = size if name is None else 2 + key_size + size
+            total -= len(_dumps_compact(section)) + 1 + inner + (1 if n_sections else 0)
+        dropped.add(id(slot))
+        omitted[section] += 1
+        if name is not None:
+            omitted_policies.add((section, name))
+    if dropped:
+        slots = [slot for slot in slots if id(slot) not in dropped]
+
+    result = _slots_to_doc(slots)
+    if omitted:
+        result["_예산초과_생략"] = dict(omitted)
+    text = _dumps_compact(result)
+    if len(text) <= max_chars:
+        return text, frozenset(omitted_policies)
+    return _budget_fallback(data, max_chars), frozenset(
+        (section, name) for section, value in data.items() if _is_policy_group(section, value)
+        for name in value)
+
+
+def _dumps_compact(value):
+    return codec.dumps(value)
+
+
+def _is_policy_group(section, value):
+    """제품 섹션 (정책이름 → 정책 dict)"""
+    return not section.startswith("_") and isinstance(value, dict)
+
+
+def _field_priority(product, key):
+    """1=먼저 제거, 2=중간, 3=유지"""
+    table = FIELD_PRIORITIES.get(product)
+    if key.endswith(("Id", "Name")) or key.startswith("_총"):
+        return 3
+    if table and key in table["high"]:
+        return 3
+    if key in COMMON_LOW_PRIORITY_FIELDS or (table and key in table["low"]):
+        return 1
+    return 2
+
+
+def _drop_fields(product, policy, max_priority):
+    """우선순위 max_priority 이하 필드를 뺀 새 dict (제거 수는 _생략필드수 에 누적)"""
+    if not isinstance(policy, dict):
+        return policy
+    kept = {k: v for k, v in policy.items()
+            if k == "_생략필드수" or _field_priority(product, k) > max_priority}
+    dropped = len(policy) - len(kept)
+    if not dropped:
+        return policy
+    kept["_생략필드수"] = kept.get("_생략필드수", 0) + dropped
+    return kept
+
+
+def _shrink_values(value, max_items=3, max_str=120):
+    """긴 목록은 앞 max_items 개 + '... 외 N개', 긴 문자열은 잘라서 새 객체로"""
+    if isinstance(value, dict):
+        return {k: _shrink_values(v, max_items, max_str) for k, v in value.items()}
+    if isinstance(value, list):
+        head = [_shrink_values(v, max_items, max_str) for v in value[:max_items]]
+        if len(value) > max_items:
+            head.append(f"... 외 {len(value) - max_items}개")
+        return head
+    if isinstance(value, str) and len(value) > max_str:
+        return value[:max_str] + "…"
+    return value
+
+
+def _slots_size(slots):
+    """슬롯들로 만든 compact JSON 의 정확한 길이 (재직렬화 없이 계산)"""
+    sections = {}
+    for section, name, _, size, key_size in slots:
+        if name is None:
+            sections[section] = size
+        else:
+            sections.setdefault(section, []).append(key_size + size)
+    total = 2 + max(len(sections) - 1, 0)
+    for section, size in sections.items():
+        if isinstance(size, list):
+            size = 2 + sum(size) + max(len(size) - 1, 0)
+        total += len(_dumps_compact(section)) + 1 + size
+    return total
+
+
+def _slots_to_doc(slots):
+    doc = {}
+    for section, name, value, _, _ in slots:
+        if name is None:
+            doc[section] = value
+        else:
+            doc.setdefault(section, {})[name] = value
+    return doc
+
+
+def _budget_fallback(data, max_chars):
+    """
+    어떤 축소로도 안 될 때의 최소 요약 (항상 유효한 JSON, max_chars 이내)
+    제품별 정책 수 → 전체 정책 수 → {} 순으로 들어가는 것을 고르고, 2자 미만 예산이면 빈 문자열
+    """
+    summary = {}
+    total = 0
+    if isinstance(data, dict):
+        for section, value in data.items():
+            if _is_policy_group(section, value):
+                summary[section] = f"정책 {len(value)}개 (토큰 예산 초과로 생략)"
+                total += len(value)
+    for candidate in ({"_요약": summary}, {"_요약": f"정책 {total}개 (토큰 예산 초과로 생략)"}, {}):
+        text = _dumps_compact(candidate)
+        if len(text) <= max_chars:
+            return text
+    return ""
 
 
 # ═══════════════════════════════════════════════════
@@ -823,26 +2286,157 @@ def get_input_stats(raw_input):
 
 
 # ═══════════════════════════════════════════════════
-# 테스트
+# 오프라인 일괄 처리 CLI — 파일/글롭/디렉터리 → NDJSON 또는 결과 디렉터리
 # ═══════════════════════════════════════════════════
+def iter_input_paths(specs, pattern="*"):
+    """
+    파일 / 글롭 / 디렉터리 지정 → (경로, 결과 이름) — 지정 순서대로, 중복 경로는 한 번만.
+    디렉터리는 하위까지 pattern 에 맞는 파일을 이름순으로, 결과 이름은 디렉터리 기준 상대 경로.
+    """
+    seen = set()
+    for spec in specs:
+        if os.path.isdir(spec):
+            paths = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(spec)
+                for name in fnmatch.filter(names, pattern)
+            )
+            base = spec
+        elif glob.has_magic(spec):
+            paths = sorted(p for p in glob.glob(spec, recursive=True) if os.path.isfile(p))
+            base = None
+        else:
+            paths = [spec]  # 없는 파일도 그대로 — 결과에 에러로 남긴다
+            base = None
+        for path in paths:
+            key = os.path.abspath(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield path, os.path.relpath(path, base) if base else os.path.basename(path)
+
+
+def parse_file_record(path, encoding="utf-8"):
+    """파일 하나 파싱 → 결과 레코드 (dict, 실패 시 "error"), 바이트 수"""
+    start = perf_counter()
+    try:
+        size = os.path.getsize(path)
+        result = parse_log_file(path, encoding)
+    except (OSError, UnicodeError, ValueError) as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}, 0
+    return {
+        "path": path,
+        "bytes": size,
+        "seconds": round(perf_counter() - start, 4),
+        "input_type": result["input_type"],
+        "policy_count": result["policy_count"],
+        "products_found": result["products_found"],
+        "errors": result["errors"],
+        "fingerprints": result["fingerprints"],
+        "policies": result["policies"],
+    }, size
+
+
+def parse_file_policies(path, encoding="utf-8"):
+    """파일 하나 → 정책 레코드 목록 (iter_log_records + "path"), 바이트 수 — 실패 시 에러 레코드 하나"""
+    try:
+        size = os.path.getsize(path)
+        records = [{"path": path, **record} for record in iter_log_records(path, encoding)]
+    except (OSError, UnicodeError, ValueError) as e:
+        return [{"path": path, "error": f"{type(e).__name__}: {e}"}], 0
+    return records, size
+
+
+def _parse_file_job(job):
+    path, name, encoding, per_policy = job
+    if per_policy:
+        records, size = parse_file_policies(path, encoding)
+    else:
+        record, size = parse_file_record(path, encoding)
+        records = [record]
+    return name, records, size
+
+
+def run_batch(specs, workers=None, encoding="utf-8", pattern="*", per_policy=False):
+    """
+    입력 파일들을 프로세스 풀에서 파일 단위로 병렬 파싱.
+    (결과 이름, 레코드 목록, 바이트 수) 를 입력 순서대로 yield 한다. workers 1 이하면 순차 처리.
+    per_policy: 레코드 목록이 파일 결과 하나 대신 정책마다 하나 (parse_file_policies)
+    """
+    jobs = [(path, name, encoding, per_policy) for path, name in iter_input_paths(specs, pattern)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs) or 1)
+    if workers <= 1:
+        yield from map(_parse_file_job, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_parse_file_job, jobs)
+
+
+def _output_path(out_dir, name, used, ext):
+    """결과 디렉터리 안의 <이름>.<ext> — 이름이 겹치면 번호를 붙인다"""
+    path = os.path.join(out_dir, f"{name}.{ext}")
+    n = 1
+    while path in used:
+        n += 1
+        path = os.path.join(out_dir, f"{name}.{n}.{ext}")
+    used.add(path)
+    return path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python parser.py",
+        description="에이전트 로그 일괄 파싱 — 입력마다 결과 하나 (NDJSON 또는 결과 디렉터리)",
+    )
+    ap.add_argument("inputs", nargs="+", help="로그 파일, 글롭('logs/**/*.log'), 디렉터리")
+    out = ap.add_mutually_exclusive_group()
+    out.add_argument("-o", "--output", default="-", help="NDJSON 출력 경로 (기본: 표준출력)")
+    out.add_argument("-d", "--output-dir", help="입력마다 <이름>.json(.ndjson) 을 쓸 결과 디렉터리")
+    ap.add_argument("--format", choices=("result", "policies"), default="result",
+                    help="result: 입력마다 결과 하나 / policies: 정책마다 한 줄 (product, policy_id, "
+                         "name, fingerprint, data)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    ap.add_argument("--pattern", default="*", help="디렉터리 입력에서 고를 파일 이름 패턴")
+    ap.add_argument("--encoding", default="utf-8")
+    args = ap.parse_args(argv)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        ndjson = None
+    elif args.output == "-":
+        ndjson = sys.stdout
+    else:
+        ndjson = open(args.output, "w", encoding="utf-8")
+
+    per_policy = args.format == "policies"
+    start = perf_counter()
+    files = failed = total_bytes = 0
+    used = set()
+    try:
+        for name, records, size in run_batch(args.inputs, args.workers, args.encoding,
+                                             args.pattern, per_policy):
+            files += 1
+            failed += any("error" in record for record in records)
+            total_bytes += size
+            if ndjson is not None:
+                ndjson.writelines(iter_ndjson(records))
+                continue
+            path = _output_path(args.output_dir, name, used, "ndjson" if per_policy else "json")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                if per_policy:
+                    f.writelines(iter_ndjson(records))
+                else:
+                    f.write(codec.dumps(records[0], pretty=True))
+    finally:
+        if ndjson is not None and ndjson is not sys.stdout:
+            ndjson.close()
+
+    elapsed = max(perf_counter() - start, 1e-9)
+    print(f"파일 {files}개 (실패 {failed}), {total_bytes / 1e6:.1f} MB, {elapsed:.2f}s — "
+          f"{files / elapsed:.1f} files/s, {total_bytes / 1e6 / elapsed:.1f} MB/s", file=sys.stderr)
+    return 1 if failed or not files else 0
+
+
 if __name__ == "__main__":
-    # 테스트: 더러운 로그
-    test_log = """260107 10:53:48:145 : [itError]:itProcFldRestrictPolicy::add, This process added aready. name=pycharm64.exe
-260107 10:53:48:146 : Sign Except Policy, sign=microsoft windows publisher, type=0
-260107 10:53:48:146 : Sign Except Policy, sign=ahnlab, inc., type=0
-260107 10:53:48:146 : Sign Except Policy, sign=innotium,inc, type=0
-260107 10:53:48:146 : accCtlAgentPolicyOff, Policy={"id":"1;","time":"1766398060;","policy":{"szAccessControlPolicyId":1,"szAccessControlPolicyName":"접근제어정책","pickHideDrive":"","pickDenyDrive":"","usbControlAuth":0,"isAccessControl":false,"isCmd":true,"isRegedit":true}}
-260107 10:53:48:178 : secureDrivePolicy, Policy={"procPolicyName":"0_기본","driveLetter":"p","driveLabel":"보안드라이브","maxCapacity":30720,"isProcessPolicy":true,"isOnlyAccProcess":true,"isDefaultEncrypt":true,"cryptoKey":"MzyNo9mtlUq8pQnH","cryptoAlg":1}"""
-
-    print("=" * 60)
-    print("테스트: 더러운 로그 파싱")
-    print("=" * 60)
-
-    result = parse_input(test_log)
-
-    print(f"입력 타입: {result['input_type']}")
-    print(f"추출 정책 수: {result['policy_count']}")
-    print(f"발견 제품: {result['products_found']}")
-    print(f"에러: {result['errors']}")
-    print(f"\n정제된 JSON ({len(result['clean_json'])}자):")
-    print(result['clean_json'])
+    sys.exit(main())
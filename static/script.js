@@ -299,11 +299,23 @@ document.addEventListener('DOMContentLoaded', () => {
 // ═══ File Reading — 복수 파일 누적 지원 ═══
 
 let loadedFileCount = 0;  // 누적 파일 수 추적
+let compressedUpload = null;  // 압축 로그 파일 (.gz/.bz2/.zip) — 그대로 업로드, 서버가 풀면서 파싱
 
-function readMultipleFiles(files) {
+const COMPRESSED_FILE_RE = /\.(gz|gzip|bz2|zip)$/i;
+const GZIP_BODY_MIN_CHARS = 64 * 1024;  // 이보다 큰 JSON 본문은 gzip 으로 전송
+
+function readMultipleFiles(allFiles) {
     let completed = 0;
     const contents = [];
 
+    const compressed = allFiles.filter(f => COMPRESSED_FILE_RE.test(f.name));
+    if (compressed.length > 0) {
+        compressedUpload = compressed[compressed.length - 1];  // 업로드는 파일 하나 — 마지막 것
+        updatePolicyBadge();
+        showToast(`압축 로그 첨부: ${compressedUpload.name} (분석 시 편집기 내용 대신 업로드)`);
+    }
+    const files = allFiles.filter(f => !COMPRESSED_FILE_RE.test(f.name));
+
     files.forEach((file, idx) => {
         const reader = new FileReader();
         reader.onload = (e) => {
@@ -352,7 +364,10 @@ function appendPolicies(fileContents) {
 
 function updatePolicyBadge() {
     const badge = document.getElementById('policyBadge');
-    if (loadedFileCount > 0) {
+    if (compressedUpload) {
+        badge.textContent = `🗜 ${compressedUpload.name} 첨부됨`;
+        badge.style.display = 'inline';
+    } else if (loadedFileCount > 0) {
         badge.textContent = `📁 ${loadedFileCount}개 파일 로드됨`;
         badge.style.display = 'inline';
     } else {
@@ -414,6 +429,7 @@ function clearInput() {
     document.getElementById('resultState').style.display = 'none';
     document.getElementById('loadingState').style.display = 'none';
     loadedFileCount = 0;
+    compressedUpload = null;
     updatePolicyBadge();
 }
 
@@ -437,12 +453,37 @@ function showToast(message) {
 }
 
 
+// ═══ Request Body — 압축 파일은 multipart, 큰 JSON 은 gzip ═══
+
+async function buildRequest(body) {
+    if (compressedUpload) {
+        const form = new FormData();
+        for (const [key, value] of Object.entries(body)) {
+            if (key !== 'policy') form.append(key, value);
+        }
+        form.append('file', compressedUpload, compressedUpload.name);
+        return { method: 'POST', body: form };
+    }
+
+    const json = JSON.stringify(body);
+    if (json.length >= GZIP_BODY_MIN_CHARS && typeof CompressionStream !== 'undefined') {
+        const stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+        return {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' },
+            body: await new Response(stream).blob()
+        };
+    }
+    return { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: json };
+}
+
+
 // ═══ Main Analyze Function ═══
 
 async function analyze() {
     const policyText = document.getElementById('policyInput').value.trim();
     
-    if (!policyText) {
+    if (!policyText && !compressedUpload) {
         showToast('정책 JSON을 입력해주세요');
         return;
     }
@@ -469,6 +510,7 @@ async function analyze() {
     };
     loadingFeature.textContent = featureLabels[currentFeature];
 
+    lastResult = '';
     try {
         let body = { policy: policyText };
         let endpoint = `/api/${currentFeature}`;
@@ -485,36 +527,25 @@ async function analyze() {
             body.query = query;
         }
 
-        const response = await fetch(endpoint, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(body)
-        });
+        // 스트리밍 엔드포인트 — 입력 오류/건너뜀은 일반 JSON 응답으로 온다
+        const response = await fetch(`${endpoint}/stream`, await buildRequest(body));
+        const contentType = response.headers.get('Content-Type') || '';
+
+        if (contentType.includes('text/event-stream') && response.body) {
+            const error = await renderStream(response);
+            if (error) showToast('분석 실패: ' + error);
+            if (!lastResult) {
+                loadingState.style.display = 'none';
+                resultState.style.display = 'none';
+                emptyState.style.display = 'flex';
+            }
+            return;
+        }
 
         const data = await response.json();
 
         if (data.success) {
-            lastResult = data.result;
-
-            // Update badge
-            const badgeText = document.getElementById('resultBadgeText');
-            const badgeLabels = {
-                translate: '번역 완료',
-                simulate: '시뮬레이션 완료',
-                diagnose: '진단 완료'
-            };
-            badgeText.textContent = badgeLabels[currentFeature];
-
-            // Render markdown
-            const resultContent = document.getElementById('resultContent');
-            if (typeof marked !== 'undefined') {
-                resultContent.innerHTML = marked.parse(data.result);
-            } else {
-                resultContent.innerHTML = '<pre>' + data.result + '</pre>';
-            }
-
-            loadingState.style.display = 'none';
-            resultState.style.display = 'flex';
+            showResult(data.result, data.llm_cache, true);
         } else {
             showToast('분석 실패: ' + (data.error || '알 수 없는 오류'));
             loadingState.style.display = 'none';
@@ -528,3 +559,92 @@ async function analyze() {
         btn.disabled = false;
     }
 }
+
+
+// ═══ Result Rendering — SSE 조각을 받는 대로 마크다운 점진 렌더링 ═══
+
+const BADGE_LABELS = {
+    translate: '번역 완료',
+    simulate: '시뮬레이션 완료',
+    diagnose: '진단 완료'
+};
+
+function showResult(text, cacheStatus, done) {
+    lastResult = text;
+
+    // Update badge
+    const badgeText = document.getElementById('resultBadgeText');
+    badgeText.textContent = done
+        ? BADGE_LABELS[currentFeature] + (cacheStatus === 'hit' ? ' (캐시)' : '')
+        : '생성 중...';
+
+    // Render markdown
+    const resultContent = document.getElementById('resultContent');
+    if (typeof marked !== 'undefined') {
+        resultContent.innerHTML = marked.parse(text);
+    } else {
+        resultContent.innerHTML = '<pre>' + text + '</pre>';
+    }
+
+    document.getElementById('loadingState').style.display = 'none';
+    document.getElementById('resultState').style.display = 'flex';
+}
+
+// text/event-stream 본문을 읽어 (event, JSON data) 마다 onEvent 호출
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) >= 0) {
+            const block = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+            let event = 'message';
+            const dataLines = [];
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart());
+            }
+            if (dataLines.length > 0) onEvent(event, JSON.parse(dataLines.join('\n')));
+        }
+    }
+}
+
+// 조각이 올 때마다 다음 프레임에 한 번만 다시 렌더링 — 실패 시 에러 메시지 반환
+async function renderStream(response) {
+    let text = '';
+    let cacheStatus = null;
+    let error = null;
+    let finished = false;
+    let scheduled = false;
+
+    const flush = () => {
+        scheduled = false;
+        if (!finished) showResult(text, cacheStatus, false);
+    };
+
+    await readEventStream(response, (event, data) => {
+        if (event === 'meta') {
+            cacheStatus = data.llm_cache;
+        } else if (event === 'chunk') {
+            text += data.text;
+            if (!scheduled) {
+                scheduled = true;
+                requestAnimationFrame(flush);
+            }
+        } else if (event === 'error') {
+            error = data.error || '알 수 없는 오류';
+        }
+    });
+
+    finished = true;
+    if (text) showResult(text, cacheStatus, !error);
+    else if (!error) error = '응답이 비어 있습니다';
+    return error;
+}